@@ -1,16 +1,30 @@
 # app/controllers/forecast_controller.py
-from fastapi import HTTPException
+from fastapi import Depends, HTTPException, Query, Request, Response
 from celery.result import AsyncResult
 from pydantic import BaseModel
-from typing import Optional, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import List, Optional, Any
 
 from app.controllers.base_controller import BaseController
-from app.services.inference_service import InferenceService
+from app.core.database import get_db
+from app.repositories.prompt_repository import PromptRepository
+from app.schemas.chat import ChatTurnOut
+from app.core.market_calendar import latest_expected_bar_date
+from app.services.admission import forecast_admission
+from app.services.forecast_cache import forecast_cache
+from app.services.inference_service import InferenceService, ScribeBusyError
+from app.services.chat_history import ChatHistoryService, ChatTurn, chat_history_recorder
 from app.tasks import task_predict_shadow_mode
+from app.worker import INTERACTIVE_QUEUE, PRIORITY
+
+async def get_chat_history_service(db: AsyncSession = Depends(get_db)):
+    return ChatHistoryService(PromptRepository(db))
 
 class ChatRequest(BaseModel):
     message: str
     symbol: str
+    user_id: Optional[int] = None
 
 # Schema for the Fire-and-Forget response
 class TaskResponse(BaseModel):
@@ -47,14 +61,49 @@ class ForecastController(BaseController):
             methods=["POST"]
         )
 
-    async def trigger_forecast(self, symbol: str):
+        self.router.add_api_route(
+            "/history/{user_id}",
+            self.get_chat_history,
+            methods=["GET"],
+            response_model=List[ChatTurnOut]
+        )
+
+    async def trigger_forecast(
+        self,
+        symbol: str,
+        request: Request,
+        response: Response,
+    ):
         """
         Starts the Shadow Mode inference in the background.
         Returns immediately with a Task ID.
+        A forecast already computed on the newest bar is returned directly (200, status "completed");
+        under overload so is the newest cached one, or 429 with Retry-After when there is none.
         """
+        symbol = symbol.upper()
+        cached = await forecast_cache.get(symbol, latest_expected_bar_date())
+        if cached is not None:
+            response.status_code = 200
+            return {"task_id": "cached", "status": "completed", "result": cached}
+
+        # Rate-limited per client address: the API has no authenticated identity a caller cannot vary
+        caller = request.client.host if request.client else "anonymous"
+        decision = await forecast_admission.admit(symbol, caller)
+        if not decision.admitted:
+            if decision.cached is not None:
+                response.status_code = 200
+                return {"task_id": "cached", "status": "completed", "result": decision.cached}
+            raise HTTPException(
+                status_code=429,
+                detail=f"Forecast service busy ({decision.reason}). Please retry shortly.",
+                headers={"Retry-After": str(decision.retry_after)},
+            )
+
         try:
-            # .delay() sends the message to Redis and returns immediately
-            task = task_predict_shadow_mode.delay(symbol.upper())
+            # Sends the message to Redis and returns immediately; routed to the interactive queue
+            task = task_predict_shadow_mode.apply_async(
+                args=[symbol], priority=PRIORITY[INTERACTIVE_QUEUE]
+            )
             
             return {
                 "task_id": task.id, 
@@ -90,13 +139,54 @@ class ForecastController(BaseController):
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Polling Error: {str(e)}")
 
-    async def post_chat(self, request: ChatRequest):
+    async def post_chat(
+        self,
+        request: ChatRequest,
+        history: ChatHistoryService = Depends(get_chat_history_service),
+        db: AsyncSession = Depends(get_db),
+    ):
         try:
-            result = await self.inference_service.chat(request.message, request.symbol)
+            result = await history.find_cached_answer(request.symbol, request.message)
+            # End the read transaction so its pooled connection is not held through the LLM call
+            await db.rollback()
+            if result is None:
+                result = await self.inference_service.chat(request.message, request.symbol)
             if "error" in result:
                 raise HTTPException(status_code=400, detail=result["error"])
+
+            # Only answers tied to a bar are worth keeping (fallback apologies have none)
+            if result.get("bar_date"):
+                chat_history_recorder.record(ChatTurn(
+                    user_id=request.user_id,
+                    symbol=request.symbol,
+                    message=request.message,
+                    response=result.get("response", ""),
+                    bar_date=date.fromisoformat(result["bar_date"]),
+                ))
             return result
         except HTTPException as he:
             raise he
+        except ScribeBusyError as e:
+            raise HTTPException(
+                status_code=429, detail="AI engine busy. Please retry shortly.",
+                headers={"Retry-After": str(e.retry_after)},
+            )
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Chat Error: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Chat Error: {str(e)}")
+
+    async def get_chat_history(
+        self,
+        user_id: int,
+        response: Response,
+        cursor: Optional[str] = None,
+        limit: int = Query(50, ge=1, le=500),
+        history: ChatHistoryService = Depends(get_chat_history_service),
+    ):
+        """Newest-first chat turns; pass X-Next-Cursor back as ?cursor= for older ones."""
+        try:
+            turns, next_cursor = await history.get_user_history(user_id, cursor, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return turns
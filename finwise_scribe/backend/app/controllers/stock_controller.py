@@ -5,6 +5,7 @@ from typing import List, Dict, Any
 
 from app.controllers.base_controller import BaseController
 from app.repositories.stock_repository import StockRepository
+from app.repositories.price_bar_repository import PriceBarRepository
 from app.services.stock_service import StockService
 from app.schemas.stock import StockBase
 from app.core.database import get_db
@@ -12,7 +13,7 @@ from app.core.database import get_db
 # NEW: Async Dependency Injection
 async def get_stock_service(db: AsyncSession = Depends(get_db)):
     repo = StockRepository(db)
-    service = StockService(repo)
+    service = StockService(repo, PriceBarRepository(db))
     return service
 
 class StockController(BaseController):
@@ -1,7 +1,7 @@
 # app/controllers/user_controller.py
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from app.controllers.base_controller import BaseController
 from app.repositories.user_repository import UserRepository
@@ -28,6 +28,9 @@ class UserController(BaseController):
         self.router.add_api_route(
             "/", self.list_users, methods=["GET"], response_model=List[UserOut]
         )
+        self.router.add_api_route(
+            "/import", self.import_users, methods=["POST"], response_model=List[UserOut]
+        )
 
     # NEW: async def
     async def create_user(self, user: UserCreate, service: UserService = Depends(get_user_service)) -> UserOut:
@@ -38,6 +41,18 @@ class UserController(BaseController):
             raise HTTPException(status_code=400, detail=str(e))
 
     # NEW: async def
-    async def list_users(self, service: UserService = Depends(get_user_service)) -> List[UserOut]:
-        # NEW: await
-        return await service.get_all()
\ No newline at end of file
+    async def list_users(
+        self,
+        response: Response,
+        cursor: Optional[int] = None,
+        limit: int = Query(100, ge=1, le=1000),
+        service: UserService = Depends(get_user_service),
+    ) -> List[UserOut]:
+        # Keyset paging: pass the X-Next-Cursor header back as ?cursor= for the next page
+        users, next_cursor = await service.get_page(cursor, limit)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        return users
+
+    async def import_users(self, users: List[UserCreate], service: UserService = Depends(get_user_service)) -> List[UserOut]:
+        return await service.import_users([u.model_dump() for u in users])
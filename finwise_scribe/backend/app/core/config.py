@@ -9,6 +9,29 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     # FIXED: Default to async driver 'postgresql+asyncpg'
     DATABASE_URL: str = "postgresql+asyncpg://postgres:postgres@db:5432/finwise"
+
+    # Database Engine (production profile; override per environment)
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0       # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800         # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500  # asyncpg prepared statements per connection
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Server-side statement_timeout (0 = off)
+    DB_COMMAND_TIMEOUT: float = 60.0    # Client-side asyncpg timeout
+    DB_CREATE_TABLES: bool = True       # create_all on startup (no migrations yet)
+
+    # Chat History (write-behind persistence)
+    CHAT_HISTORY_QUEUE_SIZE: int = 10000
+    CHAT_HISTORY_BATCH_SIZE: int = 200
+    CHAT_HISTORY_FLUSH_SECONDS: float = 1.0
+
+    # Forecast admission control (backpressure on the interactive queue)
+    FORECAST_MAX_BACKLOG: int = 64              # Queued forecasts before new ones are turned away (0 = off)
+    FORECAST_RATE_LIMIT_PER_MINUTE: int = 10    # Per client IP (0 = off)
+    FORECAST_RETRY_AFTER_SECONDS: int = 15
+    FORECAST_CACHE_TTL_SECONDS: int = 86400     # Kept this long after the next bar is due (stale overload fallback)
     
     # Model Path
     MODEL_PATH: str = "/app/ml_models/v1_adapter"
@@ -1,6 +1,8 @@
 # app/core/database.py
+import time
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
 # Ensure the URL is async-compatible even if env var is old
@@ -9,11 +11,57 @@ DATABASE_URL = settings.DATABASE_URL
 if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True, # Useful for debugging SQL generation during Phase 1
-    future=True
-)
+class PoolWaitStats:
+    """Running totals of how long requests waited to check out a connection."""
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+
+pool_wait_stats = PoolWaitStats()
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited, without changing when sessions check out."""
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.observe(time.perf_counter() - started)
+
+def _engine_options(url: str) -> dict:
+    """Pool and driver settings from the environment. SQLite (tests/local) keeps its defaults."""
+    options = {"echo": settings.DB_ECHO, "future": True}
+    if url.startswith("sqlite"):
+        return options
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if "+asyncpg" in url:
+        server_settings = {"application_name": settings.PROJECT_NAME}
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+            "server_settings": server_settings,
+        }
+    return options
+
+engine = create_async_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 
 # AsyncSessionLocal is the factory for new async sessions
 AsyncSessionLocal = async_sessionmaker(
@@ -26,10 +74,27 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+def pool_status() -> dict:
+    """Snapshot of the engine pool, for sizing it against real API concurrency."""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    stats["checkout_wait"] = {
+        "count": pool_wait_stats.count,
+        "avg_seconds": pool_wait_stats.total_seconds / pool_wait_stats.count if pool_wait_stats.count else 0.0,
+        "max_seconds": pool_wait_stats.max_seconds,
+        "last_seconds": pool_wait_stats.last_seconds,
+    }
+    return stats
+
 # New Async Dependency
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
+            # Connections are checked out lazily on first use; TimedQueuePool records the wait
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -0,0 +1,37 @@
+# app/core/market_calendar.py
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+
+# US daily bars are final a little after the 16:00 ET close (20:00/21:00 UTC)
+DAILY_BAR_READY_UTC_HOUR = 22
+
+def latest_expected_bar_date(now: Optional[datetime] = None) -> date:
+    """
+    Date of the newest daily bar that should exist right now (weekends skipped).
+    Exchange holidays are not modelled: on a holiday nothing matches, so callers
+    recompute rather than serve stale data.
+    """
+    now = now or datetime.utcnow()
+    day = now.date()
+    if now.hour < DAILY_BAR_READY_UTC_HOUR:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+def trading_days(start: date, end: date) -> List[date]:
+    """Weekdays in [start, end]; holidays are not modelled, so some of these never get a bar."""
+    days = []
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def next_bar_ready_at(bar_date: date) -> datetime:
+    """UTC time the bar after `bar_date` should be final, i.e. when `bar_date` stops being the latest."""
+    day = bar_date + timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime.combine(day, time(DAILY_BAR_READY_UTC_HOUR))
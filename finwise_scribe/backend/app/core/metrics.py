@@ -0,0 +1,114 @@
+# app/core/metrics.py
+"""
+Prometheus metrics for the API and the Celery worker.
+The API serves them at GET /metrics; the worker runs a small exporter on
+WORKER_METRICS_PORT (prefork children share PROMETHEUS_MULTIPROC_DIR).
+"""
+import os
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "finwise_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+STOOQ_FETCH_SECONDS = Histogram(
+    "finwise_stooq_fetch_duration_seconds", "Stooq download latency", ["kind"], buckets=LATENCY_BUCKETS,
+)
+STOOQ_FETCH_ERRORS = Counter("finwise_stooq_fetch_errors_total", "Failed Stooq downloads", ["kind"])
+SCRIBE_REQUEST_SECONDS = Histogram(
+    "finwise_scribe_request_duration_seconds", "Calls from the API/worker to the Scribe engine",
+    ["endpoint", "outcome"], buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter("finwise_cache_requests_total", "Cache lookups", ["cache", "result"])
+ADMISSION_DECISIONS = Counter(
+    "finwise_admission_decisions_total", "Admission control outcomes (admitted, cached, rate_limited, backlog, ...)",
+    ["endpoint", "outcome"],
+)
+CELERY_QUEUE_WAIT_SECONDS = Histogram(
+    "finwise_celery_queue_wait_seconds", "Time between publish and a worker starting the task",
+    ["task", "queue"], buckets=LATENCY_BUCKETS,
+)
+CELERY_TASK_SECONDS = Histogram(
+    "finwise_celery_task_duration_seconds", "Task run time", ["task", "state"], buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge("finwise_db_pool_checked_out", "Connections currently in use", multiprocess_mode="livesum")
+DB_POOL_CHECKOUT_WAIT_MAX = Gauge("finwise_db_pool_checkout_wait_max_seconds", "Longest pool checkout wait so far", multiprocess_mode="max")
+
+
+def metrics_registry():
+    """Aggregates every process's samples when running under a multiprocess server (Celery prefork)."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def instrument_app(app: FastAPI):
+    """Adds per-route latency middleware and the /metrics endpoint."""
+    from app.core.database import pool_status
+
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Route template (e.g. /stocks/{symbol}), not the raw path, to keep label cardinality bounded
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            if path != "/metrics":
+                HTTP_REQUEST_SECONDS.labels(request.method, path, str(status)).observe(
+                    time.perf_counter() - started
+                )
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        pool = pool_status()
+        DB_POOL_CHECKED_OUT.set(pool.get("checkedout", 0))
+        DB_POOL_CHECKOUT_WAIT_MAX.set(pool["checkout_wait"]["max_seconds"])
+        return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+# --- Celery: queue wait and run time via signals ---
+
+ENQUEUED_AT_HEADER = "enqueued_at"
+_task_started = {}
+
+def on_before_task_publish(headers=None, **kwargs):
+    # Runs in the publisher (API); stamped onto the message for the worker to read
+    if headers is not None:
+        headers[ENQUEUED_AT_HEADER] = time.time()
+
+def on_task_prerun(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _task_started[task_id] = time.perf_counter()
+    enqueued_at = getattr(task.request, ENQUEUED_AT_HEADER, None)
+    if enqueued_at is None:
+        enqueued_at = (task.request.headers or {}).get(ENQUEUED_AT_HEADER)
+    if enqueued_at is not None:
+        queue = (task.request.delivery_info or {}).get("routing_key") or "unknown"
+        CELERY_QUEUE_WAIT_SECONDS.labels(task.name, queue).observe(max(0.0, now - float(enqueued_at)))
+
+def on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+def on_worker_init(**kwargs):
+    from prometheus_client import start_http_server
+    start_http_server(int(os.getenv("WORKER_METRICS_PORT", "9808")), registry=metrics_registry())
+
+def on_worker_process_shutdown(pid=None, **kwargs):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
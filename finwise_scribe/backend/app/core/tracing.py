@@ -0,0 +1,63 @@
+"""
+OpenTelemetry tracing.
+
+    TRACING_EXPORTER=none     (default) spans are no-ops
+    TRACING_EXPORTER=otlp     OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (e.g. http://otel-collector:4318)
+    TRACING_EXPORTER=console  spans printed to stdout
+    TRACING_EXPORTER=file     one JSON span per line appended to TRACING_FILE
+
+Context is propagated through httpx headers and Celery message headers, so one
+trace covers API -> worker -> scribe -> Ollama.
+"""
+import os
+from typing import Optional
+from opentelemetry import trace
+
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "/tmp/traces.jsonl")
+
+_configured = False
+
+
+def _build_exporter():
+    if TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if TRACING_EXPORTER == "file":
+        return ConsoleSpanExporter(
+            out=open(TRACING_FILE, "a", buffering=1),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    return ConsoleSpanExporter()
+
+
+def setup_tracing(service_name: str, app=None, celery: bool = False) -> bool:
+    """Installs the tracer provider and auto-instrumentation once per process. Returns False when disabled."""
+    global _configured
+    if TRACING_EXPORTER == "none":
+        return False
+
+    if not _configured:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        provider.add_span_processor(BatchSpanProcessor(_build_exporter()))
+        trace.set_tracer_provider(provider)
+        HTTPXClientInstrumentor().instrument()
+        _configured = True
+
+    if app is not None:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics")
+    if celery:
+        from opentelemetry.instrumentation.celery import CeleryInstrumentor
+        CeleryInstrumentor().instrument()
+    return True
+
+
+def get_tracer(name: Optional[str] = None):
+    return trace.get_tracer(name or __name__)
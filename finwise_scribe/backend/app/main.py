@@ -1,14 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.controllers.user_controller import UserController
 from app.controllers.stock_controller import StockController
 from app.controllers.forecast_controller import ForecastController
 from app.core.config import settings
+from app.core.metrics import instrument_app
+from app.core.tracing import setup_tracing
+from app.core.database import Base, engine, pool_status
+from app.services.chat_history import chat_history_recorder
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_CREATE_TABLES:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    chat_history_recorder.start()
+    yield
+    # Flush queued chat turns before shutting down
+    await chat_history_recorder.stop()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="Finwise Scribe Microservice API"
+    description="Finwise Scribe Microservice API",
+    lifespan=lifespan
 )
 
 # --- CORS Middleware ---
@@ -24,8 +40,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After"],
 )
 
+instrument_app(app)
+# celery=True injects trace context into published task headers
+setup_tracing("finwise-api", app=app, celery=True)
+
 # Register Routers
 user_controller = UserController()
 stock_controller = StockController()
@@ -42,4 +63,9 @@ def health_check():
         "status": "ok",
         "env": settings.ENVIRONMENT,
         "service": "Finwise Backend"
-    }
\ No newline at end of file
+    }
+
+@app.get("/health/db")
+def db_pool_health():
+    """Connection pool occupancy and checkout wait, for sizing DB_POOL_SIZE."""
+    return pool_status()
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Date, Float, BigInteger, Index
+from app.core.database import Base
+
+class PriceBar(Base):
+    """One daily OHLCV bar. (symbol, date) is the natural key."""
+    __tablename__ = "price_bars"
+
+    symbol = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        # Covering index: chart range scans are index-only on PostgreSQL
+        Index(
+            "ix_price_bars_symbol_date_covering", "symbol", "date",
+            postgresql_include=["open", "high", "low", "close", "volume"],
+        ),
+    )
@@ -1,11 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from datetime import datetime
 
 class Prompt(Base):
     __tablename__ = "prompts"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     text = Column(String, nullable=False)
-    user = relationship("User", backref="prompts")
\ No newline at end of file
+    # Response-cache key: same question about the same symbol on the same bar
+    symbol = Column(String)
+    normalized_text = Column(String)
+    bar_date = Column(Date)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    user = relationship("User", backref="prompts")
+
+    __table_args__ = (
+        Index("ix_prompts_user_id_created_at", "user_id", "created_at"),
+        Index("ix_prompts_cache_key", "symbol", "normalized_text", "bar_date"),
+    )
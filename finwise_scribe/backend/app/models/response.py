@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from datetime import datetime
 
 class Response(Base):
     __tablename__ = "responses"
@@ -8,4 +9,9 @@ class Response(Base):
     id = Column(Integer, primary_key=True, index=True)
     prompt_id = Column(Integer, ForeignKey("prompts.id"))
     text = Column(String, nullable=False)
-    prompt = relationship("Prompt", backref="responses")
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    prompt = relationship("Prompt", backref="responses")
+
+    __table_args__ = (
+        Index("ix_responses_prompt_id", "prompt_id"),
+    )
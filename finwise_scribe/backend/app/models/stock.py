@@ -6,7 +6,7 @@ class Stock(Base):
     __tablename__ = "stocks"
 
     id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String, index=True)
+    symbol = Column(String, unique=True, index=True, nullable=False)
     company_name = Column(String)
     price = Column(Float)
     currency = Column(String)
@@ -1,8 +1,9 @@
 # app/repositories/base_repository.py
-from typing import Type, TypeVar, Generic, List, Optional
-from sqlalchemy import select
+from typing import AsyncIterator, Type, TypeVar, Generic, List, Optional, Sequence, Tuple
+from sqlalchemy import select, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import Base
+from app.repositories.unit_of_work import in_unit_of_work
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -11,6 +12,15 @@ class BaseRepository(Generic[ModelType]):
         self.db = db
         self.model = model
 
+    async def _commit(self, *objs: ModelType):
+        # Inside a UnitOfWork: flush only (assigns PKs), the UoW commits once at the end
+        if in_unit_of_work(self.db):
+            await self.db.flush()
+            return
+        await self.db.commit()
+        for obj in objs:
+            await self.db.refresh(obj)
+
     async def get(self, id: int) -> Optional[ModelType]:
         return await self.db.get(self.model, id)
 
@@ -19,10 +29,31 @@ class BaseRepository(Generic[ModelType]):
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> Tuple[List[ModelType], Optional[int]]:
+        """
+        Keyset pagination on the primary key: WHERE id > :after_id ORDER BY id LIMIT :n.
+        Cost per page is constant, unlike OFFSET. Returns (items, next_cursor or None).
+        """
+        query = select(self.model).order_by(self.model.id).limit(limit + 1)
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        result = await self.db.execute(query)
+        items = result.scalars().all()
+        if len(items) > limit:
+            items = items[:limit]
+            return items, items[-1].id
+        return items, None
+
+    async def stream(self, batch_size: int = 1000) -> AsyncIterator[ModelType]:
+        """Iterates the whole table over a server-side cursor, `batch_size` rows in memory at a time."""
+        query = select(self.model).order_by(self.model.id).execution_options(yield_per=batch_size)
+        result = await self.db.stream_scalars(query)
+        async for obj in result:
+            yield obj
+
     async def create(self, obj_in: ModelType) -> ModelType:
         self.db.add(obj_in)
-        await self.db.commit()
-        await self.db.refresh(obj_in)
+        await self._commit(obj_in)
         return obj_in
 
     async def update(self, db_obj: ModelType, obj_in_data: dict) -> ModelType:
@@ -30,14 +61,70 @@ class BaseRepository(Generic[ModelType]):
             setattr(db_obj, key, value)
         
         self.db.add(db_obj)
-        await self.db.commit()
-        await self.db.refresh(db_obj)
+        await self._commit(db_obj)
         return db_obj
 
     async def delete(self, id: int) -> bool:
         obj = await self.get(id)
         if obj:
             await self.db.delete(obj)
-            await self.db.commit()
+            await self._commit()
             return True
-        return False
\ No newline at end of file
+        return False
+
+    # --- Bulk operations: one multi-row statement instead of a round trip per row ---
+
+    async def bulk_create(self, rows: Sequence[dict]) -> List[ModelType]:
+        """INSERT ... VALUES (...), (...) RETURNING *; returns the created objects in input order."""
+        if not rows:
+            return []
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        result = await self.db.scalars(stmt, list(rows))
+        created = result.all()
+        await self._commit()
+        return created
+
+    async def bulk_upsert(self, rows: Sequence[dict], conflict_columns: Sequence[str],
+                          update_columns: Optional[Sequence[str]] = None) -> List[ModelType]:
+        """
+        INSERT ... ON CONFLICT (conflict_columns) DO UPDATE ... RETURNING *.
+        By default every supplied column except the conflict key is overwritten.
+        """
+        if not rows:
+            return []
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            raise NotImplementedError(f"bulk_upsert is not supported for dialect '{dialect}'")
+
+        if update_columns is None:
+            update_columns = [c for c in rows[0] if c not in conflict_columns]
+
+        stmt = dialect_insert(self.model)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(conflict_columns),
+                set_={c: stmt.excluded[c] for c in update_columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+        result = await self.db.scalars(
+            stmt.returning(self.model),
+            list(rows),
+            execution_options={"populate_existing": True},
+        )
+        upserted = result.all()
+        await self._commit()
+        return upserted
+
+    async def bulk_update(self, rows: Sequence[dict]) -> int:
+        """UPDATE by primary key (executemany); each row must include the PK column(s)."""
+        if not rows:
+            return 0
+        await self.db.execute(update(self.model), list(rows))
+        await self._commit()
+        return len(rows)
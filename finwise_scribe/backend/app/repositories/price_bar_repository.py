@@ -0,0 +1,72 @@
+# app/repositories/price_bar_repository.py
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.base_repository import BaseRepository
+from app.models.price_bar import PriceBar
+
+BAR_COLUMNS = ["symbol", "date", "open", "high", "low", "close", "volume"]
+# Below this many rows a multi-row upsert beats setting up a COPY
+COPY_THRESHOLD = 5000
+UPSERT_CHUNK = 1000
+
+class PriceBarRepository(BaseRepository):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, PriceBar)
+
+    async def get_range(self, symbol: str, start: date, end: Optional[date] = None) -> List[PriceBar]:
+        """Single range scan on (symbol, date), oldest first."""
+        query = select(PriceBar).where(PriceBar.symbol == symbol.upper(), PriceBar.date >= start)
+        if end is not None:
+            query = query.where(PriceBar.date <= end)
+        result = await self.db.execute(query.order_by(PriceBar.date))
+        return result.scalars().all()
+
+    async def get_dates(self, symbol: str, start: date, end: Optional[date] = None) -> List[date]:
+        """Stored bar dates in [start, end], oldest first (index-only scan)."""
+        query = select(PriceBar.date).where(PriceBar.symbol == symbol.upper(), PriceBar.date >= start)
+        if end is not None:
+            query = query.where(PriceBar.date <= end)
+        result = await self.db.execute(query.order_by(PriceBar.date))
+        return list(result.scalars().all())
+
+    async def get_bounds(self, symbol: str) -> Tuple[Optional[date], Optional[date]]:
+        """(first, last) stored bar dates for a symbol; (None, None) if there are none."""
+        query = select(func.min(PriceBar.date), func.max(PriceBar.date)).where(PriceBar.symbol == symbol.upper())
+        result = await self.db.execute(query)
+        return tuple(result.one())
+
+    async def ingest(self, rows: Sequence[dict]) -> int:
+        """Idempotent bulk load; COPY for large PostgreSQL backfills, chunked upserts otherwise."""
+        if not rows:
+            return 0
+        if self.db.bind.dialect.name == "postgresql" and len(rows) >= COPY_THRESHOLD:
+            return await self._copy_upsert(rows)
+
+        for i in range(0, len(rows), UPSERT_CHUNK):
+            await self.bulk_upsert(rows[i:i + UPSERT_CHUNK], conflict_columns=["symbol", "date"])
+        return len(rows)
+
+    async def _copy_upsert(self, rows: Sequence[dict]) -> int:
+        # COPY cannot resolve conflicts, so load a temp table and merge from it
+        conn = await self.db.connection()
+        await conn.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS price_bars_stage "
+            "(LIKE price_bars INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+        await conn.execute(text("TRUNCATE price_bars_stage"))
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "price_bars_stage",
+            records=[tuple(r[c] for c in BAR_COLUMNS) for r in rows],
+            columns=BAR_COLUMNS,
+        )
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in BAR_COLUMNS[2:])
+        await conn.execute(text(
+            f"INSERT INTO price_bars ({', '.join(BAR_COLUMNS)}) "
+            f"SELECT {', '.join(BAR_COLUMNS)} FROM price_bars_stage "
+            f"ON CONFLICT (symbol, date) DO UPDATE SET {updates}"
+        ))
+        await self._commit()
+        return len(rows)
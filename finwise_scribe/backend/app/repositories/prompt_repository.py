@@ -0,0 +1,52 @@
+# app/repositories/prompt_repository.py
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.base_repository import BaseRepository
+from app.models.prompt import Prompt
+from app.models.response import Response
+
+class PromptRepository(BaseRepository):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Prompt)
+
+    async def find_cached_response(self, symbol: str, normalized_text: str, min_bar_date: date) -> Optional[Tuple[Prompt, Response]]:
+        """Latest answer to the same question on a bar at least as new as `min_bar_date`."""
+        query = (
+            select(Prompt, Response)
+            .join(Response, Response.prompt_id == Prompt.id)
+            .where(
+                Prompt.symbol == symbol.upper(),
+                Prompt.normalized_text == normalized_text,
+                Prompt.bar_date >= min_bar_date,
+            )
+            .order_by(Prompt.bar_date.desc(), Prompt.created_at.desc())
+            .limit(1)
+        )
+        result = await self.db.execute(query)
+        row = result.first()
+        return tuple(row) if row else None
+
+    async def get_user_history(self, user_id: int, before: Optional[Tuple[datetime, int]] = None,
+                               limit: int = 50) -> Tuple[List[Tuple[Prompt, Optional[Response]]], Optional[Tuple[datetime, int]]]:
+        """
+        Newest-first chat turns for a user, keyset-paged on (created_at, id)
+        so it walks the (user_id, created_at) index. Returns (rows, next_cursor).
+        """
+        query = (
+            select(Prompt, Response)
+            .outerjoin(Response, Response.prompt_id == Prompt.id)
+            .where(Prompt.user_id == user_id)
+            .order_by(Prompt.created_at.desc(), Prompt.id.desc())
+            .limit(limit + 1)
+        )
+        if before is not None:
+            query = query.where(tuple_(Prompt.created_at, Prompt.id) < tuple_(*before))
+        result = await self.db.execute(query)
+        rows = [tuple(r) for r in result.all()]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            return rows, (last.created_at, last.id)
+        return rows, None
@@ -0,0 +1,8 @@
+# app/repositories/response_repository.py
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.base_repository import BaseRepository
+from app.models.response import Response
+
+class ResponseRepository(BaseRepository):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Response)
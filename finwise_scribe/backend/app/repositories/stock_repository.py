@@ -12,4 +12,9 @@ class StockRepository(BaseRepository):
         # NEW: Async select syntax
         query = select(Stock).where(Stock.symbol == symbol.upper())
         result = await self.db.execute(query)
-        return result.scalars().first()
\ No newline at end of file
+        return result.scalars().first()
+
+    async def upsert(self, data: dict) -> Stock:
+        """Atomic INSERT ... ON CONFLICT (symbol) DO UPDATE ... RETURNING: one round trip, race-free."""
+        rows = await self.bulk_upsert([data], conflict_columns=["symbol"])
+        return rows[0]
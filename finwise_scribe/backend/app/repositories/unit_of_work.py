@@ -0,0 +1,37 @@
+# app/repositories/unit_of_work.py
+from sqlalchemy.ext.asyncio import AsyncSession
+
+UOW_DEPTH_KEY = "uow_depth"
+
+def in_unit_of_work(db: AsyncSession) -> bool:
+    return db.info.get(UOW_DEPTH_KEY, 0) > 0
+
+class UnitOfWork:
+    """
+    Groups repository writes into one transaction.
+
+        async with UnitOfWork(db):
+            await users.create(a)
+            await users.bulk_create(rows)
+        # single COMMIT here (ROLLBACK on error)
+
+    Inside the block repositories only flush. Nested blocks join the outermost one.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def __aenter__(self):
+        self.db.info[UOW_DEPTH_KEY] = self.db.info.get(UOW_DEPTH_KEY, 0) + 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        depth = self.db.info[UOW_DEPTH_KEY] - 1
+        self.db.info[UOW_DEPTH_KEY] = depth
+        if depth > 0:
+            return False
+
+        if exc_type is None:
+            await self.db.commit()
+        else:
+            await self.db.rollback()
+        return False
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Optional
+
+class ChatTurnOut(BaseModel):
+    prompt_id: int
+    symbol: Optional[str] = None
+    message: str
+    response: Optional[str] = None
+    bar_date: Optional[date] = None
+    created_at: datetime
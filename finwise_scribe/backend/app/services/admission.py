@@ -0,0 +1,110 @@
+# app/services/admission.py
+import time
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_DECISIONS
+from app.services.forecast_cache import forecast_cache
+from app.worker import BROKER_URL, INTERACTIVE_QUEUE, celery_app
+
+logger = logging.getLogger(__name__)
+
+RATE_KEY = "admission:rate:{scope}:{caller}:{window}"
+
+@dataclass
+class AdmissionDecision:
+    admitted: bool
+    reason: str = "ok"              # ok | rate_limited | backlog
+    retry_after: int = 0
+    cached: Optional[dict] = None   # last good forecast to serve instead of a 429
+
+class ForecastAdmission:
+    """
+    Gatekeeper in front of the forecast queue.
+
+    Rejects new work when the interactive Celery backlog is past FORECAST_MAX_BACKLOG or the
+    caller's address is past FORECAST_RATE_LIMIT_PER_MINUTE. A rejected caller is served the newest cached
+    forecast for the symbol if there is one, otherwise told to retry later.
+    Redis trouble fails open: admission control must never be the thing that takes forecasts down.
+    """
+    def __init__(self, redis_url: str, max_backlog: int = 64, rate_per_minute: int = 10,
+                 retry_after_seconds: int = 15, fail_open_seconds: float = 5.0):
+        self.redis_url = redis_url
+        self.max_backlog = max_backlog
+        self.rate_per_minute = rate_per_minute
+        self.retry_after_seconds = retry_after_seconds
+        self.fail_open_seconds = fail_open_seconds
+        self._client = None
+        self._skip_until = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = aioredis.from_url(
+                self.redis_url, socket_connect_timeout=0.25, socket_timeout=0.25
+            )
+        return self._client
+
+    async def queue_depth(self, queue: str = INTERACTIVE_QUEUE) -> int:
+        # With Redis priorities kombu keeps one list per step: "<queue>", "<queue>:1", ... "<queue>:9"
+        options = celery_app.conf.broker_transport_options
+        sep = options.get("sep", ":")
+        keys = [queue] + [f"{queue}{sep}{p}" for p in options.get("priority_steps", []) if p]
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.llen(key)
+            lengths = await pipe.execute()
+        return sum(lengths)
+
+    async def _rate_limited(self, scope: str, caller: str) -> int:
+        """Fixed one-minute window. Returns seconds until the window resets, or 0 if allowed."""
+        if self.rate_per_minute <= 0:
+            return 0
+        now = int(time.time())
+        key = RATE_KEY.format(scope=scope, caller=caller, window=now // 60)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, 60)
+            count, _ = await pipe.execute()
+        if count > self.rate_per_minute:
+            return 60 - now % 60
+        return 0
+
+    async def admit(self, symbol: str, caller: str) -> AdmissionDecision:
+        if time.monotonic() < self._skip_until:
+            return self._record(AdmissionDecision(True, reason="redis_unavailable"))
+        try:
+            decision = AdmissionDecision(True)
+            retry_after = await self._rate_limited("forecast", caller)
+            if retry_after:
+                decision = AdmissionDecision(False, "rate_limited", retry_after)
+            elif self.max_backlog > 0 and await self.queue_depth() >= self.max_backlog:
+                decision = AdmissionDecision(False, "backlog", self.retry_after_seconds)
+
+            if not decision.admitted:
+                decision.cached = await forecast_cache.get(symbol)
+            return self._record(decision)
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Admission control unavailable, admitting: {e}")
+            self._skip_until = time.monotonic() + self.fail_open_seconds
+            return self._record(AdmissionDecision(True, reason="redis_unavailable"))
+
+    def _record(self, decision: AdmissionDecision) -> AdmissionDecision:
+        if decision.admitted:
+            outcome = "admitted" if decision.reason == "ok" else decision.reason
+        else:
+            outcome = "cached" if decision.cached is not None else decision.reason
+        ADMISSION_DECISIONS.labels("forecast", outcome).inc()
+        return decision
+
+forecast_admission = ForecastAdmission(
+    BROKER_URL,
+    max_backlog=settings.FORECAST_MAX_BACKLOG,
+    rate_per_minute=settings.FORECAST_RATE_LIMIT_PER_MINUTE,
+    retry_after_seconds=settings.FORECAST_RETRY_AFTER_SECONDS,
+)
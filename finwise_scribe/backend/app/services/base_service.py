@@ -1,5 +1,6 @@
 # app/services/base_service.py
 from typing import Dict
+from app.repositories.unit_of_work import UnitOfWork
 class BaseService:
     def __init__(self, repository):
         self.repo = repository
@@ -7,5 +8,12 @@ class BaseService:
     def get_all(self):
         return self.repo.get_all()
 
+    def get_page(self, cursor=None, limit: int = 100):
+        return self.repo.get_page(cursor, limit)
+
     def create(self, data: Dict):
         return self.repo.create(data)
+
+    def unit_of_work(self) -> UnitOfWork:
+        """Batch several repository writes into one transaction (one COMMIT)."""
+        return UnitOfWork(self.repo.db)
@@ -0,0 +1,169 @@
+# app/services/chat_history.py
+import re
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.market_calendar import latest_expected_bar_date
+from app.core.metrics import CACHE_REQUESTS
+from app.repositories.prompt_repository import PromptRepository
+from app.repositories.response_repository import ResponseRepository
+from app.repositories.unit_of_work import UnitOfWork
+from app.services.base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_message(message: str) -> str:
+    """Case/whitespace/trailing-punctuation insensitive form used as the cache key."""
+    return _WHITESPACE.sub(" ", message).strip().rstrip("?!. ").lower()
+
+@dataclass
+class ChatTurn:
+    user_id: Optional[int]
+    symbol: str
+    message: str
+    response: str
+    bar_date: Optional[date]
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+class ChatHistoryRecorder:
+    """
+    Write-behind persistence for chat turns.
+    Requests only enqueue; a background task drains the queue and writes each
+    batch as one multi-row INSERT for prompts and one for responses.
+    """
+    def __init__(self, session_factory=AsyncSessionLocal,
+                 max_queue: int = settings.CHAT_HISTORY_QUEUE_SIZE,
+                 batch_size: int = settings.CHAT_HISTORY_BATCH_SIZE,
+                 flush_seconds: float = settings.CHAT_HISTORY_FLUSH_SECONDS):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._pending: List[ChatTurn] = []
+
+    def record(self, turn: ChatTurn):
+        try:
+            self.queue.put_nowait(turn)
+        except asyncio.QueueFull:
+            # History is best-effort; never block or fail the chat request on it
+            self.dropped += 1
+            logger.warning(f"Chat history queue full, dropped turn ({self.dropped} total)")
+
+    def start(self):
+        if self._task is None:
+            # Re-create the queue on the running loop, keeping anything recorded before startup
+            pending, self.queue = self.queue, asyncio.Queue(maxsize=self.queue.maxsize)
+            while not pending.empty():
+                self.queue.put_nowait(pending.get_nowait())
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the writer after flushing everything already queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+        batch, self._pending = self._pending, []
+        await self.flush(batch)
+        while not self.queue.empty():
+            await self.flush(self._drain())
+
+    def _drain(self, limit: Optional[int] = None) -> List[ChatTurn]:
+        limit = self.batch_size if limit is None else limit
+        batch = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            self._pending = [await self.queue.get()]
+            # Give the batch a moment to fill before writing
+            await asyncio.sleep(self.flush_seconds)
+            self._pending += self._drain(self.batch_size - 1)
+            batch, self._pending = self._pending, []
+            # Shielded so shutdown never interrupts a half-written batch
+            self._inflight = asyncio.ensure_future(self.flush(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    async def flush(self, batch: List[ChatTurn]):
+        if not batch:
+            return
+        try:
+            async with self.session_factory() as db:
+                prompts, responses = PromptRepository(db), ResponseRepository(db)
+                async with UnitOfWork(db):
+                    created = await prompts.bulk_create([
+                        {
+                            "user_id": t.user_id,
+                            "text": t.message,
+                            "symbol": t.symbol.upper(),
+                            "normalized_text": normalize_message(t.message),
+                            "bar_date": t.bar_date,
+                            "created_at": t.created_at,
+                        }
+                        for t in batch
+                    ])
+                    await responses.bulk_create([
+                        {"prompt_id": p.id, "text": t.response, "created_at": t.created_at}
+                        for p, t in zip(created, batch)
+                    ])
+        except Exception as e:
+            logger.error(f"Failed to persist {len(batch)} chat turns: {str(e)}")
+
+chat_history_recorder = ChatHistoryRecorder()
+
+def parse_cursor(cursor: str) -> Tuple[datetime, int]:
+    """"<created_at ISO>,<prompt id>" as returned in X-Next-Cursor. ValueError if it is anything else."""
+    try:
+        created_at, prompt_id = cursor.rsplit(",", 1)
+        return datetime.fromisoformat(created_at), int(prompt_id)
+    except ValueError:
+        raise ValueError("invalid cursor")
+
+class ChatHistoryService(BaseService):
+    async def find_cached_answer(self, symbol: str, message: str) -> Optional[dict]:
+        """Stored answer for this question if it was computed on the newest expected bar."""
+        hit = await self.repo.find_cached_response(
+            symbol, normalize_message(message), latest_expected_bar_date()
+        )
+        CACHE_REQUESTS.labels("chat_response", "miss" if hit is None else "hit").inc()
+        if hit is None:
+            return None
+        prompt, response = hit
+        return {"response": response.text, "bar_date": prompt.bar_date.isoformat(), "cached": True}
+
+    async def get_user_history(self, user_id: int, cursor: Optional[str] = None, limit: int = 50):
+        before = parse_cursor(cursor) if cursor else None
+
+        rows, next_key = await self.repo.get_user_history(user_id, before, limit)
+        turns = [
+            {
+                "prompt_id": prompt.id,
+                "symbol": prompt.symbol,
+                "message": prompt.text,
+                "response": response.text if response else None,
+                "bar_date": prompt.bar_date,
+                "created_at": prompt.created_at,
+            }
+            for prompt, response in rows
+        ]
+        next_cursor = f"{next_key[0].isoformat()},{next_key[1]}" if next_key else None
+        return turns, next_cursor
@@ -0,0 +1,92 @@
+# app/services/forecast_cache.py
+import time
+import logging
+from datetime import date, datetime
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.market_calendar import next_bar_ready_at
+from app.core.metrics import CACHE_REQUESTS
+from app.worker import BACKEND_URL, celery_app
+
+logger = logging.getLogger(__name__)
+
+FORECAST_KEY = "forecast:{symbol}:{bar_date}"
+LATEST_KEY = "forecast:latest:{symbol}"
+
+class ForecastCache:
+    """
+    Forecasts keyed by (symbol, bar_date) in the Celery result backend.
+
+    A forecast only changes when a new daily bar arrives, so every request for the same
+    symbol and bar can reuse one result. Entries are encoded with the backend's result
+    serializer (msgpack) and live until the next bar is due (Friday's through the weekend)
+    plus FORECAST_CACHE_TTL_SECONDS, so memory is bounded by symbols x recent bars rather
+    than growing with every task id.
+    forecast:latest:<symbol> points at the newest bar_date, for serving slightly stale
+    forecasts when admission control turns a request away.
+    """
+    def __init__(self, redis_url: str, ttl_seconds: int = 86400, fail_open_seconds: float = 5.0):
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self.fail_open_seconds = fail_open_seconds
+        self._client = None
+        self._skip_until = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = aioredis.from_url(
+                self.redis_url, socket_connect_timeout=0.25, socket_timeout=0.25
+            )
+        return self._client
+
+    async def get(self, symbol: str, bar_date: Optional[date] = None) -> Optional[dict]:
+        """Forecast for this bar, or for the newest bar cached when `bar_date` is None. Errors read as a miss."""
+        symbol = symbol.upper()
+        cache = "forecast" if bar_date is not None else "forecast_latest"
+        if time.monotonic() < self._skip_until:
+            return None
+        try:
+            if bar_date is None:
+                latest = await self.client.get(LATEST_KEY.format(symbol=symbol))
+                if latest is None:
+                    CACHE_REQUESTS.labels(cache, "miss").inc()
+                    return None
+                bar_date = latest.decode()
+            raw = await self.client.get(FORECAST_KEY.format(symbol=symbol, bar_date=bar_date))
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Forecast cache unavailable: {e}")
+            self._skip_until = time.monotonic() + self.fail_open_seconds
+            CACHE_REQUESTS.labels(cache, "error").inc()
+            return None
+
+        CACHE_REQUESTS.labels(cache, "hit" if raw else "miss").inc()
+        return celery_app.backend.decode(raw) if raw else None
+
+    def expiry_seconds(self, bar_date: str, now: Optional[datetime] = None) -> int:
+        """Seconds until the bar is superseded, plus the ttl_seconds grace."""
+        now = now or datetime.utcnow()
+        superseded_in = (next_bar_ready_at(date.fromisoformat(bar_date)) - now).total_seconds()
+        return int(max(superseded_in, 0) + self.ttl_seconds)
+
+    def store(self, symbol: str, result: dict):
+        """Called by the worker after a successful forecast (sync; reuses the result backend's client)."""
+        bar_date = result.get("bar_date")
+        if not bar_date:
+            return
+        symbol = symbol.upper()
+        ttl = self.expiry_seconds(bar_date)
+        try:
+            with celery_app.backend.client.pipeline(transaction=False) as pipe:
+                pipe.set(FORECAST_KEY.format(symbol=symbol, bar_date=bar_date),
+                         celery_app.backend.encode(result), ex=ttl)
+                pipe.set(LATEST_KEY.format(symbol=symbol), bar_date, ex=ttl)
+                pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Could not cache forecast for {symbol}: {e}")
+
+forecast_cache = ForecastCache(BACKEND_URL, ttl_seconds=settings.FORECAST_CACHE_TTL_SECONDS)
@@ -1,10 +1,22 @@
 import httpx
 import os
+import time
 import logging
+from app.core.metrics import SCRIBE_REQUEST_SECONDS
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+class ScribeBusyError(Exception):
+    """The Scribe engine is at its in-flight limit (HTTP 429); retry after `retry_after` seconds."""
+    def __init__(self, retry_after: int = 5):
+        super().__init__(f"Scribe engine busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+def _raise_if_busy(response: httpx.Response):
+    if response.status_code == 429:
+        raise ScribeBusyError(int(response.headers.get("Retry-After", "5")))
+
 class InferenceService:
     def __init__(self):
         # Default to the internal docker alias
@@ -15,6 +27,8 @@ class InferenceService:
 
     async def predict_next_move(self, ticker: str):
         async with httpx.AsyncClient(timeout=self.timeout) as client:
+            started = time.perf_counter()
+            outcome = "error"
             try:
                 # FIX 1: Send to /predict (no ID in URL) and pass symbol in JSON body
                 url = f"{self.scribe_url}/predict"
@@ -23,9 +37,14 @@ class InferenceService:
                 logger.info(f"Sending prediction request to {url} with payload {payload}")
                 
                 response = await client.post(url, json=payload)
-                
+                _raise_if_busy(response)
                 response.raise_for_status()
+                outcome = "ok"
                 return response.json()
+
+            except ScribeBusyError:
+                outcome = "busy"
+                raise
                 
             except httpx.ConnectError:
                 logger.error("Failed to connect to Scribe Service")
@@ -43,8 +62,13 @@ class InferenceService:
                 logger.error(f"Unexpected error: {str(e)}")
                 return {"error": f"System Error: {str(e)}"}
 
+            finally:
+                SCRIBE_REQUEST_SECONDS.labels("predict", outcome).observe(time.perf_counter() - started)
+
     async def chat(self, message: str, context: str):
         async with httpx.AsyncClient(timeout=self.timeout) as client:
+            started = time.perf_counter()
+            outcome = "error"
             try:
                 url = f"{self.scribe_url}/chat"
                 
@@ -55,9 +79,18 @@ class InferenceService:
                 }
                 
                 response = await client.post(url, json=payload)
+                _raise_if_busy(response)
                 response.raise_for_status()
+                outcome = "ok"
                 return response.json()
+
+            except ScribeBusyError:
+                outcome = "busy"
+                raise
                 
             except Exception as e:
                 logger.error(f"Chat failed: {str(e)}")
-                return {"response": "I'm having trouble thinking right now. Please try again."}
\ No newline at end of file
+                return {"response": "I'm having trouble thinking right now. Please try again."}
+
+            finally:
+                SCRIBE_REQUEST_SECONDS.labels("chat", outcome).observe(time.perf_counter() - started)
\ No newline at end of file
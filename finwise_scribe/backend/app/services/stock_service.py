@@ -1,26 +1,82 @@
 # app/services/stock_service.py
 import asyncio
+import logging
+import time
 from pandas_datareader import data as pdr
-from datetime import datetime, timedelta
+import app.core.stooq  # noqa: F401  (applies the STOOQ_URL override)
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from app.core.market_calendar import latest_expected_bar_date, trading_days
+from app.core.metrics import CACHE_REQUESTS, STOOQ_FETCH_SECONDS, STOOQ_FETCH_ERRORS
 from app.services.base_service import BaseService
-from app.models.stock import Stock
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
+# Per-process memory of trading days Stooq had no bar for when asked (symbol -> day -> when).
+# Older days are holidays or pre-listing history and are not asked for again; days close to
+# the newest expected bar may just be late and are re-checked every RECENT_BAR_RECHECK_SECONDS.
+_unavailable_bars: Dict[str, Dict[date, float]] = {}
+RECENT_BAR_DAYS = 7
+RECENT_BAR_RECHECK_SECONDS = 900
+
+def _bar_due(symbol: str, day: date, expected_end: date, now: float) -> bool:
+    checked = _unavailable_bars.get(symbol, {}).get(day)
+    if checked is None:
+        return True
+    return (expected_end - day).days <= RECENT_BAR_DAYS and now - checked >= RECENT_BAR_RECHECK_SECONDS
+
+def _to_stooq_symbol(symbol: str) -> str:
+    search_symbol = symbol.upper()
+    if "." not in search_symbol:
+        search_symbol = f"{search_symbol}.US"
+    return search_symbol
+
+def _frame_to_bar_rows(symbol: str, df: pd.DataFrame) -> List[Dict]:
+    return [
+        {
+            "symbol": symbol.upper(),
+            "date": ts.date(),
+            "open": float(row["Open"]),
+            "high": float(row["High"]),
+            "low": float(row["Low"]),
+            "close": float(row["Close"]),
+            "volume": int(row["Volume"]),
+        }
+        for ts, row in df.iterrows()
+    ]
+
+def _bars_to_chart_rows(bars) -> List[Dict]:
+    return [
+        {
+            "time": bar.date.strftime('%Y-%m-%d'),
+            "open": bar.open,
+            "high": bar.high,
+            "low": bar.low,
+            "close": bar.close,
+            "volume": int(bar.volume)
+        }
+        for bar in bars
+    ]
+
 class StockService(BaseService):
+    def __init__(self, repository, bar_repository=None):
+        super().__init__(repository)
+        self.bar_repo = bar_repository
     
     async def fetch_and_update_stock(self, symbol: str):
         start_date = datetime.now() - timedelta(days=10)
-        search_symbol = symbol.upper()
-        if "." not in search_symbol:
-            search_symbol = f"{search_symbol}.US"
-        
+        search_symbol = _to_stooq_symbol(symbol)
+
         # CRITICAL: Run blocking Pandas IO in a separate thread
         # This prevents the API from freezing while waiting for Stooq
         try:
-            df = await asyncio.to_thread(
-                pdr.get_data_stooq, search_symbol, start=start_date
-            )
+            with STOOQ_FETCH_SECONDS.labels("quote").time():
+                df = await asyncio.to_thread(
+                    pdr.get_data_stooq, search_symbol, start=start_date
+                )
         except Exception as e:
+            STOOQ_FETCH_ERRORS.labels("quote").inc()
             # Handle connection errors gracefuly
             raise ValueError(f"External API Error: {str(e)}")
         
@@ -34,51 +90,73 @@ class StockService(BaseService):
             "symbol": symbol.upper(),
             "company_name": symbol.upper(),
             "price": current_price,
-            "currency": "USD"
+            "currency": "USD",
+            "last_updated": datetime.utcnow()
         }
 
-        # NEW: Await the async repo call
-        stock = await self.repo.get_by_symbol(symbol)
-        
-        if stock:
-            # Reuse the generic async update method from BaseRepository
-            # This handles setattr, commit, and refresh internally
-            return await self.repo.update(stock, data)
-        else:
-            stock = Stock(**data)
-            return await self.repo.create(stock)
+        # Single INSERT ... ON CONFLICT: no read-then-write race between concurrent refreshes.
+        # The quote download already holds the last few daily bars; keep them in the same commit.
+        async with self.unit_of_work():
+            if self.bar_repo is not None:
+                await self.bar_repo.ingest(_frame_to_bar_rows(symbol, df))
+            return await self.repo.upsert(data)
 
-    async def get_history(self, symbol: str, days: int = 100):
-        """Fetches OHLCV data for the frontend chart."""
-        start_date = datetime.now() - timedelta(days=days)
-        
-        search_symbol = symbol.upper()
-        if "." not in search_symbol:
-            search_symbol = f"{search_symbol}.US"
-            
+    async def _fetch_bars(self, symbol: str, start: date, end: Optional[date] = None) -> List[Dict]:
         # CRITICAL: Run blocking Pandas IO in a separate thread
         try:
-            df = await asyncio.to_thread(
-                pdr.get_data_stooq, search_symbol, start=start_date
-            )
+            with STOOQ_FETCH_SECONDS.labels("history").time():
+                df = await asyncio.to_thread(
+                    pdr.get_data_stooq, _to_stooq_symbol(symbol), start=start, end=end
+                )
         except Exception:
-             raise ValueError(f"Could not fetch history for {symbol}")
-        
-        if df.empty:
+            STOOQ_FETCH_ERRORS.labels("history").inc()
+            raise
+        if df is None or df.empty:
+            return []
+        return _frame_to_bar_rows(symbol, df)
+
+    async def _sync_history(self, symbol: str, start: date):
+        """
+        Downloads the trading days in [start, newest expected bar] missing from price_bars,
+        including holes left between isolated quote bars, in one range request.
+        """
+        expected_end = latest_expected_bar_date()
+        stored = set(await self.bar_repo.get_dates(symbol, start, expected_end))
+        now = time.monotonic()
+        missing = [
+            day for day in trading_days(start, expected_end)
+            if day not in stored and _bar_due(symbol, day, expected_end, now)
+        ]
+
+        CACHE_REQUESTS.labels("price_bars", "fill" if missing else "hit").inc()
+        if not missing:
+            return
+        rows = await self._fetch_bars(symbol, missing[0], missing[-1])
+        await self.bar_repo.ingest(rows)
+
+        fetched = {row["date"] for row in rows}
+        unavailable = _unavailable_bars.setdefault(symbol, {})
+        for day in missing:
+            if day in fetched:
+                unavailable.pop(day, None)
+            else:
+                unavailable[day] = now
+
+    async def get_history(self, symbol: str, days: int = 100):
+        """Fetches OHLCV data for the frontend chart from price_bars, filling gaps from Stooq."""
+        symbol = symbol.upper()
+        start_date = (datetime.now() - timedelta(days=days)).date()
+
+        try:
+            await self._sync_history(symbol, start_date)
+        except Exception as e:
+            # Serve whatever is stored; only fail if there is nothing at all
+            logger.warning(f"History fill for {symbol} failed: {str(e)}")
+            await self.bar_repo.db.rollback()
+
+        bars = await self.bar_repo.get_range(symbol, start_date)
+        if not bars:
             raise ValueError(f"No historical data for {symbol}")
 
         # Lightweight Charts expects ascending order (oldest -> newest)
-        df = df.sort_index(ascending=True)
-        
-        history = []
-        for date, row in df.iterrows():
-            history.append({
-                "time": date.strftime('%Y-%m-%d'),
-                "open": row['Open'],
-                "high": row['High'],
-                "low": row['Low'],
-                "close": row['Close'],
-                "volume": int(row['Volume'])
-            })
-            
-        return history
\ No newline at end of file
+        return _bars_to_chart_rows(bars)
@@ -1,5 +1,6 @@
 # app/services/user_service.py
 from app.services.base_service import BaseService
+from typing import Dict, List
 from app.models.user import User
 
 class UserService(BaseService):
@@ -12,4 +13,10 @@ class UserService(BaseService):
         user = User(name=name, email=email)
         
         # NEW: Await the creation
-        return await self.repo.create(user)
\ No newline at end of file
+        return await self.repo.create(user)
+
+    async def import_users(self, users: List[Dict]):
+        """Creates or renames users in one statement; the email is the natural key."""
+        # Last occurrence wins, a single INSERT cannot touch the same row twice
+        rows = list({u["email"]: u for u in users}.values())
+        return await self.repo.bulk_upsert(rows, conflict_columns=["email"])
@@ -1,6 +1,7 @@
 import asyncio
 from app.worker import celery_app
-from app.services.inference_service import InferenceService
+from app.services.forecast_cache import forecast_cache
+from app.services.inference_service import InferenceService, ScribeBusyError
 
 # Helper to run async code in the synchronous Celery worker
 def run_async(coro):
@@ -27,8 +28,16 @@ def task_predict_shadow_mode(self, ticker: str):
         if isinstance(result, dict) and "error" in result:
              # You might want to log this or raise a specific exception
              pass
+        elif isinstance(result, dict):
+            # Reused by every request for this (symbol, bar_date), and by admission control under load
+            forecast_cache.store(ticker, result)
 
         return result
+
+    except ScribeBusyError as e:
+        # Scribe is at its in-flight limit: back off for as long as it asked, with a separate,
+        # larger retry budget (busy is expected under load, unlike the engine being down)
+        raise self.retry(exc=e, countdown=e.retry_after, max_retries=12)
         
     except Exception as e:
         # Retry logic: If the Scribe engine is momentarily down, retry in 5s.
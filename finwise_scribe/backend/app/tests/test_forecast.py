@@ -11,14 +11,14 @@ async def test_trigger_forecast_success(client: AsyncClient):
     Verifies that POST /forecast:
     1. Returns HTTP 202 (Accepted)
     2. Returns a Task ID
-    3. Calls the Celery 'delay' method exactly once
+    3. Enqueues the Celery task exactly once, at interactive priority
     """
     # Patch the task object imported in the controller
     with patch("app.controllers.forecast_controller.task_predict_shadow_mode") as mock_task:
         # Setup the mock to return a fake Task object with an ID
         mock_task_instance = MagicMock()
         mock_task_instance.id = "mock-task-id-123"
-        mock_task.delay.return_value = mock_task_instance
+        mock_task.apply_async.return_value = mock_task_instance
 
         # Make the request
         response = await client.post("/ai/forecast/AAPL")
@@ -30,7 +30,7 @@ async def test_trigger_forecast_success(client: AsyncClient):
         assert data["status"] == "processing"
         
         # Verify that the backend actually tried to send it to Redis
-        mock_task.delay.assert_called_once_with("AAPL")
+        mock_task.apply_async.assert_called_once_with(args=["AAPL"], priority=0)
 
 
 # -------------------------------------------------------------------------
@@ -86,4 +86,153 @@ async def test_poll_status_completed(client: AsyncClient):
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "completed"
-        assert data["result"]["llm_analysis"] == "BULLISH"
\ No newline at end of file
+        assert data["result"]["llm_analysis"] == "BULLISH"
+
+# -------------------------------------------------------------------------
+# TEST 4: Chat History (write-behind persistence + per-user paging)
+# -------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_chat_history_recorded_and_paged(client: AsyncClient):
+    """
+    Verifies that queued chat turns are written in one batch
+    and GET /ai/history/{user_id} pages through them newest-first.
+    """
+    from datetime import date
+    from app.services.chat_history import ChatHistoryRecorder, ChatTurn
+    from app.tests.conftest import TestingSessionLocal
+
+    recorder = ChatHistoryRecorder(session_factory=TestingSessionLocal)
+    for i in range(3):
+        recorder.record(ChatTurn(user_id=1, symbol="aapl", message=f"Question {i}?",
+                                 response=f"Answer {i}", bar_date=date(2024, 1, 2)))
+    await recorder.stop()  # flushes the queue
+
+    first = await client.get("/ai/history/1", params={"limit": 2})
+    assert first.status_code == 200
+    assert [t["message"] for t in first.json()] == ["Question 2?", "Question 1?"]
+    assert first.json()[0]["response"] == "Answer 2"
+
+    second = await client.get("/ai/history/1", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [t["message"] for t in second.json()] == ["Question 0?"]
+    assert "X-Next-Cursor" not in second.headers
+
+    # A cursor that was not issued by the API is a client error, not a 500
+    for bad in ("garbage", "not-a-date,5", "2024-01-01T00:00:00,abc"):
+        response = await client.get("/ai/history/1", params={"cursor": bad})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "invalid cursor"
+
+
+# -------------------------------------------------------------------------
+# TEST 5: Chat Cache (same question on the same bar skips the LLM)
+# -------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_chat_served_from_cache_on_same_bar(client: AsyncClient):
+    from unittest.mock import AsyncMock
+    from app.core.market_calendar import latest_expected_bar_date
+    from app.services.chat_history import ChatHistoryRecorder, ChatTurn, chat_history_recorder
+    from app.tests.conftest import TestingSessionLocal
+
+    recorder = ChatHistoryRecorder(session_factory=TestingSessionLocal)
+    recorder.record(ChatTurn(user_id=None, symbol="AAPL", message="Is AAPL bullish?",
+                             response="Volume is surging.", bar_date=latest_expected_bar_date()))
+    await recorder.stop()
+
+    with patch("app.services.inference_service.InferenceService.chat", new_callable=AsyncMock) as mock_chat:
+        # Different casing/spacing/punctuation hits the same cache entry
+        response = await client.post("/ai/chat", json={"message": "  is aapl   BULLISH ", "symbol": "aapl"})
+
+        assert response.status_code == 200
+        assert response.json()["response"] == "Volume is surging."
+        assert response.json()["cached"] is True
+        mock_chat.assert_not_called()
+
+        # A new question goes to the LLM; both turns are queued for the user's history
+        mock_chat.return_value = {"response": "Flat.", "bar_date": "2024-01-02"}
+        response = await client.post("/ai/chat", json={"message": "What about volume?", "symbol": "AAPL"})
+        assert response.json()["response"] == "Flat."
+        mock_chat.assert_called_once()
+        assert chat_history_recorder.queue.qsize() == 2
+        chat_history_recorder._drain()
+
+
+# -------------------------------------------------------------------------
+# TEST 6: Admission Control (backlog full -> 429, rate limited -> last good forecast)
+# -------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_forecast_admission_control(client: AsyncClient):
+    from unittest.mock import AsyncMock
+    from app.services.admission import forecast_admission
+    from app.services.forecast_cache import forecast_cache
+
+    with patch.object(forecast_admission, "_skip_until", 0.0), \
+         patch.object(forecast_admission, "_rate_limited", new_callable=AsyncMock, return_value=0), \
+         patch.object(forecast_admission, "queue_depth", new_callable=AsyncMock,
+                      return_value=forecast_admission.max_backlog), \
+         patch.object(forecast_cache, "get", new_callable=AsyncMock, return_value=None), \
+         patch("app.controllers.forecast_controller.task_predict_shadow_mode") as mock_task:
+        # Interactive queue is full and nothing is cached: the caller is told to back off
+        response = await client.post("/ai/forecast/AAPL")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) == forecast_admission.retry_after_seconds
+        mock_task.apply_async.assert_not_called()
+
+        # Over the per-client limit, but a forecast from an earlier bar exists: it is served immediately.
+        # A client-supplied user_id does not change the rate-limit key
+        forecast_admission._rate_limited.return_value = 42
+        forecast_cache.get.side_effect = [None, {"symbol": "AAPL", "prediction": "P_MID_V_LOW"}]
+        response = await client.post("/ai/forecast/aapl?user_id=7")
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        assert response.json()["result"]["prediction"] == "P_MID_V_LOW"
+        forecast_admission._rate_limited.assert_awaited_with("forecast", "127.0.0.1")
+        forecast_cache.get.assert_awaited_with("AAPL")
+        mock_task.apply_async.assert_not_called()
+
+
+# -------------------------------------------------------------------------
+# TEST 7: Forecast Cache (same symbol on the same bar reuses the stored result)
+# -------------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_forecast_reused_for_same_bar(client: AsyncClient):
+    from unittest.mock import AsyncMock
+    from app.core.market_calendar import latest_expected_bar_date
+    from app.services.forecast_cache import forecast_cache
+    from app.worker import celery_app
+
+    forecast = {"symbol": "MSFT", "prediction": "P_SURGE_V_HIGH", "confidence": 0.7,
+                "bar_date": latest_expected_bar_date().isoformat()}
+    # Stored with the result backend's serializer (msgpack) and decoded on the way out
+    encoded = celery_app.backend.encode(forecast)
+    assert celery_app.backend.content_type == "application/x-msgpack"
+
+    fake_redis = MagicMock()
+    fake_redis.get = AsyncMock(return_value=encoded)
+    with patch.object(forecast_cache, "_skip_until", 0.0), \
+         patch.object(forecast_cache, "_client", fake_redis), \
+         patch("app.controllers.forecast_controller.task_predict_shadow_mode") as mock_task:
+        response = await client.post("/ai/forecast/msft")
+
+    assert response.status_code == 200
+    assert response.json() == {"task_id": "cached", "status": "completed", "result": forecast}
+    fake_redis.get.assert_awaited_once_with(f"forecast:MSFT:{latest_expected_bar_date()}")
+    mock_task.apply_async.assert_not_called()
+
+
+# -------------------------------------------------------------------------
+# TEST 8: Forecast Cache expiry (Friday's forecast outlives the weekend)
+# -------------------------------------------------------------------------
+def test_forecast_cache_expiry_spans_weekend():
+    from datetime import datetime
+    from app.core.market_calendar import latest_expected_bar_date
+    from app.services.forecast_cache import ForecastCache
+
+    cache = ForecastCache("redis://unused", ttl_seconds=3600)
+    stored_at = datetime(2024, 6, 7, 22, 30)   # Friday, just after the bar closed
+    sunday = datetime(2024, 6, 9, 18, 0)
+    assert latest_expected_bar_date(sunday).isoformat() == "2024-06-07"
+
+    ttl = cache.expiry_seconds("2024-06-07", now=stored_at)
+    # Still cached on Sunday, and until Monday's bar is due (22:00 UTC) plus the grace period
+    assert ttl > (sunday - stored_at).total_seconds()
+    assert ttl == (datetime(2024, 6, 10, 22, 0) - stored_at).total_seconds() + 3600
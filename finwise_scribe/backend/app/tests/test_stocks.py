@@ -10,6 +10,14 @@ async def test_health_check(client: AsyncClient):
     assert response.status_code == 200
     assert response.json()["status"] == "ok"
 
+@pytest.mark.asyncio
+async def test_db_pool_health(client: AsyncClient):
+    response = await client.get("/health/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pool_class"]
+    assert {"count", "avg_seconds", "max_seconds"} <= data["checkout_wait"].keys()
+
 @pytest.mark.asyncio
 async def test_get_stock_not_found(client: AsyncClient):
     # Patch 'asyncio.to_thread' directly in the service module
@@ -40,4 +48,86 @@ async def test_get_stock_success(client: AsyncClient):
         assert response.status_code == 200
         data = response.json()
         assert data["symbol"] == "AAPL"
-        assert data["price"] == 150.0
\ No newline at end of file
+        assert data["price"] == 150.0
+
+@pytest.mark.asyncio
+async def test_get_history_served_from_price_bars(client: AsyncClient):
+    # Stooq returns newest-first
+    mock_df = pd.DataFrame(
+        {'Open': [11.0, 10.0], 'High': [12.0, 11.0], 'Low': [10.5, 9.5], 'Close': [11.5, 10.5], 'Volume': [2000, 1000]},
+        index=pd.to_datetime([datetime.now().date(), datetime.now().date() - pd.Timedelta(days=1)])
+    )
+
+    with patch("app.services.stock_service.asyncio.to_thread") as mock_thread:
+        mock_thread.return_value = mock_df
+        response = await client.get("/stocks/HIST/history")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [bar["close"] for bar in data] == [10.5, 11.5]
+        assert data[-1]["volume"] == 2000
+        first_calls = mock_thread.call_count
+
+        # Second request is a pure range query: no new downloads
+        response = await client.get("/stocks/HIST/history")
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        assert mock_thread.call_count == first_calls
+
+@pytest.mark.asyncio
+async def test_get_history_fills_holes_between_stored_bars(client: AsyncClient, async_db):
+    from datetime import timedelta
+    from app.core.market_calendar import latest_expected_bar_date, trading_days
+    from app.repositories.price_bar_repository import PriceBarRepository
+
+    start = (datetime.now() - timedelta(days=100)).date()
+    days = trading_days(start, latest_expected_bar_date())
+    # Quoted, ignored for a few days, quoted again: a hole in the middle of the stored history
+    hole = days[20:23]
+    bar = {"open": 10.0, "high": 11.0, "low": 9.0, "close": 10.5, "volume": 1000}
+    await PriceBarRepository(async_db).ingest(
+        [{"symbol": "GAPS", "date": day, **bar} for day in days if day not in hole]
+    )
+    await async_db.commit()
+
+    mock_df = pd.DataFrame(
+        {'Open': [10.0] * 3, 'High': [11.0] * 3, 'Low': [9.0] * 3, 'Close': [10.5] * 3, 'Volume': [1000] * 3},
+        index=pd.to_datetime(list(reversed(hole)))
+    )
+    with patch("app.services.stock_service.asyncio.to_thread") as mock_thread:
+        mock_thread.return_value = mock_df
+        response = await client.get("/stocks/GAPS/history")
+
+        assert response.status_code == 200
+        assert [bar["time"] for bar in response.json()] == [day.isoformat() for day in days]
+        # Only the hole is downloaded
+        mock_thread.assert_called_once()
+        assert mock_thread.call_args.kwargs["start"] == hole[0]
+        assert mock_thread.call_args.kwargs["end"] == hole[-1]
+
+@pytest.mark.asyncio
+async def test_stock_refresh_upserts_single_row(client: AsyncClient, async_db):
+    from sqlalchemy import select, func
+    from app.models.stock import Stock
+
+    for price in (150.0, 151.0):
+        mock_df = pd.DataFrame(
+            {'Close': [price], 'Volume': [10000], 'Open': [145.0], 'High': [155.0], 'Low': [140.0]},
+            index=[datetime.now()]
+        )
+        with patch("app.services.stock_service.asyncio.to_thread") as mock_thread:
+            mock_thread.return_value = mock_df
+            response = await client.get("/stocks/msft")
+            assert response.status_code == 200
+            assert response.json()["price"] == price
+
+    count = await async_db.scalar(select(func.count()).select_from(Stock).where(Stock.symbol == "MSFT"))
+    assert count == 1
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient):
+    await client.get("/")
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert 'finwise_http_request_duration_seconds_count{method="GET",route="/",status="200"}' in response.text
+    assert "finwise_db_pool_checked_out" in response.text
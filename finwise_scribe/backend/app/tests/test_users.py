@@ -37,4 +37,71 @@ async def test_list_users(client: AsyncClient):
     response = await client.get("/users/")
     
     assert response.status_code == 200
-    assert len(response.json()) >= 2
\ No newline at end of file
+    assert len(response.json()) >= 2
+
+@pytest.mark.asyncio
+async def test_list_users_cursor_pagination(client: AsyncClient):
+    """Cursor ile sayfalama: sayfalar çakışmaz ve son sayfada cursor yoktur."""
+    await client.post("/users/import", json=[
+        {"name": f"U{i}", "email": f"page{i}@test.com"} for i in range(5)
+    ])
+
+    first = await client.get("/users/", params={"limit": 3})
+    assert len(first.json()) == 3
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = await client.get("/users/", params={"limit": 3, "cursor": cursor})
+    assert len(second.json()) == 2
+    assert "X-Next-Cursor" not in second.headers
+    ids = [u["id"] for u in first.json() + second.json()]
+    assert ids == sorted(set(ids))
+
+@pytest.mark.asyncio
+async def test_import_users_upserts_by_email(client: AsyncClient):
+    """Toplu içe aktarma: mevcut email güncellenir, yeniler eklenir."""
+    await client.post("/users/", json={"name": "Old Name", "email": "a@test.com"})
+
+    response = await client.post("/users/import", json=[
+        {"name": "New Name", "email": "a@test.com"},
+        {"name": "B", "email": "b@test.com"},
+    ])
+
+    assert response.status_code == 200
+    by_email = {u["email"]: u for u in response.json()}
+    assert by_email["a@test.com"]["name"] == "New Name"
+    assert "b@test.com" in by_email
+
+    listed = (await client.get("/users/")).json()
+    assert len(listed) == 2
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_once_and_rolls_back(async_db):
+    """Unit of work: hata durumunda tüm yazımlar geri alınır."""
+    from app.models.user import User
+    from app.repositories.user_repository import UserRepository
+    from app.repositories.unit_of_work import UnitOfWork
+
+    repo = UserRepository(async_db)
+    async with UnitOfWork(async_db):
+        await repo.create(User(name="U1", email="u1@uow.com"))
+        await repo.bulk_create([{"name": "U2", "email": "u2@uow.com"}])
+    assert len(await repo.get_all()) == 2
+
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(async_db):
+            await repo.create(User(name="U3", email="u3@uow.com"))
+            raise RuntimeError("boom")
+    assert len(await repo.get_all()) == 2
+
+    updated = await repo.bulk_update([{"id": u.id, "name": "Renamed"} for u in await repo.get_all()])
+    assert updated == 2
+
+@pytest.mark.asyncio
+async def test_stream_yields_all_rows(async_db):
+    """Akış (stream) tüm satırları id sırasıyla döndürür."""
+    from app.repositories.user_repository import UserRepository
+
+    repo = UserRepository(async_db)
+    await repo.bulk_create([{"name": f"S{i}", "email": f"s{i}@test.com"} for i in range(7)])
+    names = [u.name async for u in repo.stream(batch_size=3)]
+    assert names == [f"S{i}" for i in range(7)]
@@ -1,5 +1,8 @@
 import os
-from celery import Celery
+from celery import Celery, signals
+from kombu import Queue
+from app.core import metrics
+from app.core.tracing import setup_tracing
 
 # Get Redis URL from env (default to localhost for local testing outside docker)
 BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
@@ -14,8 +17,14 @@ celery_app = Celery(
 # Standard configuration for robust task handling
 celery_app.conf.update(
     task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    accept_content=["json", "msgpack"],
+    # Results (forecast dicts with reasoning text) are stored as msgpack: smaller than JSON in
+    # Redis and cheaper to (de)serialize. "json" stays accepted so older results still decode.
+    result_serializer="msgpack",
+    result_accept_content=["json", "msgpack"],
+    # Clients poll a task id for seconds, not days; reusable forecasts live under
+    # (symbol, bar_date) keys instead (see app/services/forecast_cache.py)
+    result_expires=int(os.getenv("CELERY_RESULT_EXPIRES", "3600")),
     timezone="UTC",
     enable_utc=True,
     # Late ack means the task is only removed from Redis AFTER it finishes successfully.
@@ -23,5 +32,79 @@ celery_app.conf.update(
     task_acks_late=True,
 )
 
+# --- Queues ---
+# User-triggered work must not wait behind bulk jobs, so each class of work gets its own
+# queue and (in docker-compose) its own worker pool:
+#   interactive        forecasts a user is polling for
+#   batch              retraining, backtests, watchlist warm-ups
+#   shadow_validation  telemetry that can lag arbitrarily
+# Task names are routed by prefix, so new batch jobs only need a "batch." / "shadow." name.
+INTERACTIVE_QUEUE = "interactive"
+BATCH_QUEUE = "batch"
+SHADOW_QUEUE = "shadow_validation"
+
+# Redis priorities: 0 is served first. They order messages within a queue, and across
+# queues when one worker consumes several (e.g. a single dev worker with -Q interactive,batch,...)
+PRIORITY = {INTERACTIVE_QUEUE: 0, BATCH_QUEUE: 6, SHADOW_QUEUE: 9}
+
+celery_app.conf.update(
+    task_queues=[Queue(INTERACTIVE_QUEUE), Queue(BATCH_QUEUE), Queue(SHADOW_QUEUE)],
+    # Anything unrouted is assumed to be bulk work rather than allowed to compete with users
+    task_default_queue=BATCH_QUEUE,
+    task_default_priority=PRIORITY[BATCH_QUEUE],
+    task_routes={
+        "predict_shadow_mode": {"queue": INTERACTIVE_QUEUE},
+        "batch.*": {"queue": BATCH_QUEUE},
+        "shadow.*": {"queue": SHADOW_QUEUE},
+    },
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+)
+
+# --- Worker pools ---
+# WORKER_POOL selects the pool this process runs as; start it with the matching -Q.
+# prefetch_multiplier=1 with acks_late keeps at most one reserved task per child, so a
+# long batch job never holds interactive tasks hostage in its prefetch buffer.
+WORKER_POOLS = {
+    INTERACTIVE_QUEUE: {
+        # Keep <= the scribe's SCRIBE_MAX_IN_FLIGHT (default 4), or the surplus only waits on 429 retries
+        "concurrency": int(os.getenv("WORKER_INTERACTIVE_CONCURRENCY", "4")),
+        "prefetch_multiplier": int(os.getenv("WORKER_INTERACTIVE_PREFETCH", "1")),
+    },
+    BATCH_QUEUE: {
+        "concurrency": int(os.getenv("WORKER_BATCH_CONCURRENCY", "2")),
+        "prefetch_multiplier": int(os.getenv("WORKER_BATCH_PREFETCH", "1")),
+    },
+    SHADOW_QUEUE: {
+        "concurrency": int(os.getenv("WORKER_SHADOW_CONCURRENCY", "1")),
+        "prefetch_multiplier": int(os.getenv("WORKER_SHADOW_PREFETCH", "1")),
+    },
+}
+WORKER_POOL = os.getenv("WORKER_POOL", "")
+
+if WORKER_POOL:
+    if WORKER_POOL not in WORKER_POOLS:
+        raise ValueError(f"Unknown WORKER_POOL '{WORKER_POOL}'. Expected one of {list(WORKER_POOLS)}")
+    pool = WORKER_POOLS[WORKER_POOL]
+    celery_app.conf.update(
+        worker_concurrency=pool["concurrency"],
+        worker_prefetch_multiplier=pool["prefetch_multiplier"],
+    )
+
+# Metrics: queue wait (publish -> start) and run time per task, exported on WORKER_METRICS_PORT
+signals.before_task_publish.connect(metrics.on_before_task_publish, weak=False)
+signals.task_prerun.connect(metrics.on_task_prerun, weak=False)
+signals.task_postrun.connect(metrics.on_task_postrun, weak=False)
+signals.worker_init.connect(metrics.on_worker_init, weak=False)
+signals.worker_process_shutdown.connect(metrics.on_worker_process_shutdown, weak=False)
+
+# Tracing: set up after fork, in each pool process (the exporter runs a background thread)
+@signals.worker_process_init.connect(weak=False)
+def init_worker_tracing(**kwargs):
+    setup_tracing("finwise-worker", celery=True)
+
 # Autodiscover tasks in the 'app' module
 celery_app.autodiscover_tasks(["app.tasks"])
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Micro-benchmarks for the API's per-request data conversion, on synthetic
+OHLCV of increasing length (parametrized by YEARS, read as a scaling curve).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+YEARS = [1, 5, 20]
+TRADING_DAYS_PER_YEAR = 252
+
+
+def synthetic_stooq_frame(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk daily bars, newest first (the order pdr.get_data_stooq returns)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.005, n_bars))
+    df = pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) * 1.004,
+            "Low": np.minimum(open_, close) * 0.996,
+            "Close": close,
+            "Volume": rng.lognormal(15, 0.4, n_bars).astype(np.int64),
+        },
+        index=pd.bdate_range("1990-01-01", periods=n_bars, name="Date"),
+    )
+    return df.sort_index(ascending=False)
+
+
+@pytest.fixture(params=YEARS, ids=lambda y: f"{y}y")
+def stooq_frame(request) -> pd.DataFrame:
+    return synthetic_stooq_frame(request.param * TRADING_DAYS_PER_YEAR)
@@ -0,0 +1,15 @@
+from app.models.price_bar import PriceBar
+from app.services.stock_service import _bars_to_chart_rows, _frame_to_bar_rows
+
+
+def test_frame_to_bar_rows(benchmark, stooq_frame):
+    """Stooq DataFrame -> price_bars rows (ingest path of get_history / quote refresh)."""
+    rows = benchmark(_frame_to_bar_rows, "BENCH", stooq_frame)
+    assert len(rows) == len(stooq_frame)
+
+
+def test_bars_to_chart_rows(benchmark, stooq_frame):
+    """ORM PriceBar objects -> chart JSON rows (every get_history response)."""
+    bars = [PriceBar(**row) for row in _frame_to_bar_rows("BENCH", stooq_frame.sort_index())]
+    rows = benchmark(_bars_to_chart_rows, bars)
+    assert rows[0]["time"] < rows[-1]["time"]
@@ -0,0 +1,71 @@
+"""
+Stand-in for Stooq's daily CSV endpoint (GET /q/d/l/?s=MSFT.US&i=d&d1=YYYYMMDD&d2=YYYYMMDD).
+
+    uvicorn fake_stooq:app --app-dir benchmarks --port 8080
+    STOOQ_URL=http://localhost:8080/q/d/l/   # in the api / worker / scribe environment
+
+Serves <FAKE_STOOQ_DATA_DIR>/<SYMBOL>.csv when present (canned data), otherwise a
+deterministic random walk seeded by the symbol, so every run sees identical bars.
+Symbols starting with NODATA answer like Stooq does for unknown tickers.
+"""
+import os
+import asyncio
+import hashlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from fastapi import FastAPI, Query
+from fastapi.responses import PlainTextResponse
+
+DATA_DIR = os.getenv("FAKE_STOOQ_DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
+LATENCY_MS = float(os.getenv("FAKE_STOOQ_LATENCY_MS", "50"))
+HISTORY_START = "2000-01-03"
+
+app = FastAPI(title="Fake Stooq", version="1.0.0")
+
+
+def synthetic_bars(symbol: str) -> pd.DataFrame:
+    seed = int(hashlib.sha256(symbol.upper().encode()).hexdigest(), 16) % (2 ** 32)
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(HISTORY_START, datetime.utcnow().date())
+
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, len(dates))))
+    open_ = close * (1 + rng.normal(0, 0.005, len(dates)))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, len(dates))))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, len(dates))))
+    volume = rng.lognormal(15, 0.4, len(dates)).astype(np.int64)
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=pd.Index(dates, name="Date"),
+    ).round(4)
+
+
+_frames = {}
+
+def load_bars(symbol: str) -> pd.DataFrame:
+    if symbol not in _frames:
+        path = os.path.join(DATA_DIR, f"{symbol}.csv")
+        if os.path.exists(path):
+            _frames[symbol] = pd.read_csv(path, index_col="Date", parse_dates=True).sort_index()
+        else:
+            _frames[symbol] = synthetic_bars(symbol)
+    return _frames[symbol]
+
+
+@app.get("/q/d/l/", response_class=PlainTextResponse)
+async def daily_csv(s: str, i: str = "d", d1: str = None, d2: str = None):
+    if LATENCY_MS > 0:
+        await asyncio.sleep(LATENCY_MS / 1000.0)
+
+    symbol = s.upper()
+    if symbol.startswith("NODATA"):
+        return "No data"
+
+    df = load_bars(symbol)
+    if d1:
+        df = df.loc[df.index >= pd.Timestamp(d1)]
+    if d2:
+        df = df.loc[df.index <= pd.Timestamp(d2)]
+    if df.empty:
+        return "No data"
+    return df.to_csv(date_format="%Y-%m-%d")
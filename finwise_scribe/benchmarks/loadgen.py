@@ -0,0 +1,254 @@
+"""
+Closed-loop load generator for the Finwise API.
+
+Each of --concurrency virtual users repeatedly picks an operation from the --mix
+(seeded, so runs are reproducible) and waits for it to finish:
+
+    stocks    GET  /stocks/{symbol}
+    history   GET  /stocks/{symbol}/history?timeframe=...
+    forecast  POST /ai/forecast/{symbol}, then polls /ai/tasks/{id} (end-to-end latency);
+              a 200 "completed" answer (cached forecast for the bar) needs no polling
+    chat      POST /ai/chat (questions repeat, so the response cache is exercised)
+
+Usage:
+    python benchmarks/loadgen.py --api http://localhost:8000 --duration 60 --concurrency 16
+    python benchmarks/loadgen.py ... --compare benchmarks/results/<baseline>.json --max-regression 0.15
+
+Writes benchmarks/results/<timestamp>-<commit>.json with throughput, p50/p95/p99
+and error rate per operation. 429s from admission control are counted as "shed", not as
+errors or latencies. --compare exits 1 if any p95 or error rate regressed.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+import httpx
+import numpy as np
+from datetime import datetime
+from typing import Dict, List
+
+OPERATIONS = ("stocks", "history", "forecast", "chat")
+DEFAULT_MIX = "stocks=35,history=30,forecast=10,chat=25"
+DEFAULT_SYMBOLS = ["MSFT", "AAPL", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "JPM"]
+CHAT_QUESTIONS = [
+    "Is the trend bullish?",
+    "What does the volume tell us?",
+    "Summarize the last week.",
+    "Is volatility rising?",
+]
+TIMEFRAMES = ["1D", "1W", "1Y"]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class OperationFailed(Exception):
+    pass
+
+
+class OperationShed(Exception):
+    """429: the API turned the request away under load (admission control)."""
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'. Expected one of {OPERATIONS}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL,
+        ).strip()
+    except Exception:
+        return os.getenv("GIT_COMMIT", "unknown")
+
+
+class LoadGenerator:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], symbols: List[str],
+                 seed: int = 0, poll_interval: float = 0.25, forecast_timeout: float = 120.0):
+        self.client = client
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.symbols = symbols
+        self.rng = random.Random(seed)
+        self.poll_interval = poll_interval
+        self.forecast_timeout = forecast_timeout
+        self.latencies = {op: [] for op in self.ops}
+        self.errors = {op: 0 for op in self.ops}
+        self.shed = {op: 0 for op in self.ops}
+
+    @staticmethod
+    def _check(r: httpx.Response, expected=(200,)):
+        if r.status_code == 429:
+            raise OperationShed(r.headers.get("Retry-After"))
+        if r.status_code not in expected:
+            raise OperationFailed(r.status_code)
+
+    async def _stocks(self, symbol: str):
+        r = await self.client.get(f"/stocks/{symbol}")
+        self._check(r)
+
+    async def _history(self, symbol: str):
+        r = await self.client.get(f"/stocks/{symbol}/history", params={"timeframe": self.rng.choice(TIMEFRAMES)})
+        self._check(r)
+
+    async def _forecast(self, symbol: str):
+        r = await self.client.post(f"/ai/forecast/{symbol}")
+        self._check(r, expected=(200, 202))
+        body = r.json()
+        if r.status_code == 200:
+            # Served from the forecast cache (same bar, or admission control's fallback)
+            if body.get("status") != "completed":
+                raise OperationFailed(body.get("status"))
+            return
+        task_id = body["task_id"]
+        deadline = time.monotonic() + self.forecast_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            status = (await self.client.get(f"/ai/tasks/{task_id}")).json()
+            if status["status"] == "completed":
+                if isinstance(status.get("result"), dict) and "error" in status["result"]:
+                    raise OperationFailed(status["result"]["error"])
+                return
+            if status["status"] == "failed":
+                raise OperationFailed(status.get("result"))
+        raise OperationFailed("timeout")
+
+    async def _chat(self, symbol: str):
+        r = await self.client.post("/ai/chat", json={"message": self.rng.choice(CHAT_QUESTIONS), "symbol": symbol})
+        self._check(r)
+
+    async def _virtual_user(self, deadline: float):
+        while time.monotonic() < deadline:
+            op = self.rng.choices(self.ops, self.weights)[0]
+            symbol = self.rng.choice(self.symbols)
+            started = time.perf_counter()
+            try:
+                await getattr(self, f"_{op}")(symbol)
+                self.latencies[op].append(time.perf_counter() - started)
+            except OperationShed:
+                self.shed[op] += 1
+            except (OperationFailed, httpx.HTTPError):
+                self.errors[op] += 1
+
+    async def run(self, duration: float, concurrency: int) -> Dict:
+        started = time.perf_counter()
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(self._virtual_user(deadline) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        return summarize(self.latencies, self.errors, elapsed, self.shed)
+
+
+def _stats(latencies: List[float], errors: int, elapsed: float, shed: int = 0) -> Dict:
+    total = len(latencies) + errors + shed
+    stats = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "shed": shed,
+        "shed_rate": shed / total if total else 0.0,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+    }
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        stats.update({"p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "p99_ms": p99 * 1000,
+                      "mean_ms": float(np.mean(latencies)) * 1000})
+    return stats
+
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float,
+              shed: Dict[str, int] = None) -> Dict:
+    shed = shed or {}
+    per_op = {op: _stats(latencies[op], errors[op], elapsed, shed.get(op, 0)) for op in latencies}
+    all_latencies = [x for values in latencies.values() for x in values]
+    overall = _stats(all_latencies, sum(errors.values()), elapsed, sum(shed.values()))
+    return {"elapsed_seconds": elapsed, "overall": overall, "operations": per_op}
+
+
+def compare(current: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Human-readable regressions (empty list = no regression)."""
+    regressions = []
+    for op, stats in current["results"]["operations"].items():
+        base = baseline["results"]["operations"].get(op)
+        if not base or "p95_ms" not in base or "p95_ms" not in stats:
+            continue
+        ratio = stats["p95_ms"] / base["p95_ms"] if base["p95_ms"] else 1.0
+        print(f"{op:<10} p95 {base['p95_ms']:9.1f} -> {stats['p95_ms']:9.1f} ms ({ratio - 1:+.1%})  "
+              f"errors {base['error_rate']:.2%} -> {stats['error_rate']:.2%}")
+        if ratio > 1 + max_regression:
+            regressions.append(f"{op}: p95 +{ratio - 1:.1%}")
+        if stats["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{op}: error rate {base['error_rate']:.2%} -> {stats['error_rate']:.2%}")
+    return regressions
+
+
+def print_report(results: Dict):
+    print(f"{'operation':<10} {'reqs':>7} {'err%':>6} {'shed%':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(results["operations"].items()) + [("overall", results["overall"])]
+    for op, s in rows:
+        print(f"{op:<10} {s['requests']:>7} {s['error_rate'] * 100:>5.1f}% {s.get('shed_rate', 0.0) * 100:>5.1f}% "
+              f"{s['throughput_rps']:>8.2f} "
+              f"{s.get('p50_ms', float('nan')):>9.1f} {s.get('p95_ms', float('nan')):>9.1f} {s.get('p99_ms', float('nan')):>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency/throughput benchmark for the Finwise API.")
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of unmeasured load first")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weights, e.g. stocks=35,history=30,forecast=10,chat=25")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request HTTP timeout")
+    parser.add_argument("--out", default=RESULTS_DIR)
+    parser.add_argument("--compare", default=None, help="Baseline result JSON to diff against")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Allowed relative p95 increase")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+
+    async def _run():
+        async with httpx.AsyncClient(base_url=args.api, timeout=args.timeout, limits=limits) as client:
+            if args.warmup > 0:
+                await LoadGenerator(client, mix, args.symbols, seed=args.seed + 1).run(args.warmup, args.concurrency)
+            return await LoadGenerator(client, mix, args.symbols, seed=args.seed).run(args.duration, args.concurrency)
+
+    results = asyncio.run(_run())
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "results": results,
+    }
+    print_report(results)
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{report['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print("REGRESSIONS: " + "; ".join(regressions))
+            sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
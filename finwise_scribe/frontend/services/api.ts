@@ -56,12 +56,18 @@ export const ApiService = {
           method: 'POST' // Changed from GET to POST
       });
       
+      if (triggerResponse.status === 429) {
+          const retryAfter = triggerResponse.headers.get('Retry-After');
+          throw new Error(`Forecast service busy, retry in ${retryAfter ?? 'a few'}s`);
+      }
       if (!triggerResponse.ok) throw new Error('Failed to start forecast task');
       
       const triggerData: TaskResponse = await triggerResponse.json();
       
-      // 2. Poll until we get the result
-      const result = await ApiService.pollTask(triggerData.task_id);
+      // 2. Poll until we get the result (under load the API may answer with a recent cached forecast)
+      const result = triggerData.status === 'completed'
+          ? triggerData.result
+          : await ApiService.pollTask(triggerData.task_id);
       
       // 3. Return the clean data
       return {
@@ -1,4 +1,5 @@
 import os
+import json
 
 class Settings:
     PROJECT_NAME: str = "Finwise Scribe Engine"
@@ -6,5 +7,50 @@ class Settings:
     # Connects to the Ollama container defined in docker-compose
     OLLAMA_URL: str = os.getenv("OLLAMA_URL", "http://ollama:11434")
     MODEL_NAME: str = "finwise_scribe_v1" # Matches the tag we will give in Ollama
+    # How token sequences are written into prompts: verbose | rle | short | short_rle
+    # (see app/ml/sequence_encoding.py). Per-model overrides as JSON, e.g. {"finwise_scribe_v2": "short_rle"}
+    SEQUENCE_ENCODING: str = os.getenv("SEQUENCE_ENCODING", "verbose")
+    MODEL_SEQUENCE_ENCODINGS: dict = json.loads(os.getenv("MODEL_SEQUENCE_ENCODINGS", "{}"))
+    # Prompt prefix caching (see app/services/prompts.py)
+    OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "24h")  # keep the model and its KV cache loaded
+    PROMPT_WINDOW_ALIGN: int = int(os.getenv("PROMPT_WINDOW_ALIGN", "1"))  # 1 = exact windows; e.g. 5 = weekly-aligned
+    # Upper bound on forecast generation length; the schema-constrained JSON needs ~70 tokens
+    LLM_NUM_PREDICT: int = int(os.getenv("LLM_NUM_PREDICT", "128"))
 
-settings = Settings()
\ No newline at end of file
+    # LLM backends, tried in order (see app/services/llm_backends.py): ollama | openai | llamacpp | fake
+    LLM_BACKENDS: list = [b.strip() for b in os.getenv("LLM_BACKENDS", "ollama").split(",") if b.strip()]
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "300"))
+    LLM_FAILURE_THRESHOLD: int = int(os.getenv("LLM_FAILURE_THRESHOLD", "3"))  # consecutive failures before cool-down
+    LLM_COOLDOWN_SECONDS: float = float(os.getenv("LLM_COOLDOWN_SECONDS", "30"))
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "http://localhost:8000")
+    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "")  # empty = MODEL_NAME
+    LLAMA_CPP_MODEL_PATH: str = os.getenv("LLAMA_CPP_MODEL_PATH", "/app/models/finwise_scribe_v1.gguf")
+    LLAMA_CPP_MODELFILE: str = os.getenv("LLAMA_CPP_MODELFILE", "/app/models/Modelfile")  # SYSTEM + PARAMETERs
+    LLAMA_CPP_N_CTX: int = int(os.getenv("LLAMA_CPP_N_CTX", "0"))  # 0 = the Modelfile's num_ctx
+    LLAMA_CPP_THREADS: int = int(os.getenv("LLAMA_CPP_THREADS", "0"))  # 0 = physical cores
+
+    # Shadow-Mode Validation (rolling backtest, runs after the forecast is returned)
+    # Modes: "always" | "sample" (SHADOW_SAMPLE_RATE of requests) | "once_per_bar" | "off"
+    SHADOW_VALIDATION_MODE: str = os.getenv("SHADOW_VALIDATION_MODE", "once_per_bar")
+    SHADOW_SAMPLE_RATE: float = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+    SHADOW_VALIDATION_WINDOW: int = int(os.getenv("SHADOW_VALIDATION_WINDOW", "3"))
+    # Max LLM generations per minute spent on shadow work (0 = LSTM-only validation)
+    SHADOW_LLM_BUDGET_PER_MINUTE: int = int(os.getenv("SHADOW_LLM_BUDGET_PER_MINUTE", "12"))
+
+    # LSTM Model Registry (versioned artifacts + hot reload)
+    LSTM_MODEL_DIR: str = os.getenv("LSTM_MODEL_DIR", "/app/models")
+    LSTM_RELOAD_INTERVAL_SECONDS: float = float(os.getenv("LSTM_RELOAD_INTERVAL_SECONDS", "30"))  # 0 = off
+    LSTM_CANDIDATE_FRACTION: float = float(os.getenv("LSTM_CANDIDATE_FRACTION", "0.0"))
+
+    # Admission control: concurrent /predict + /chat beyond this get 429 + Retry-After (0 = unlimited)
+    MAX_IN_FLIGHT: int = int(os.getenv("SCRIBE_MAX_IN_FLIGHT", "4"))
+    BUSY_RETRY_AFTER_SECONDS: int = int(os.getenv("SCRIBE_BUSY_RETRY_AFTER_SECONDS", "5"))
+
+    # Per-request profiling (see app/core/profiling.py)
+    PROFILING_ADMIN_TOKEN: str = os.getenv("PROFILING_ADMIN_TOKEN", "")  # empty = on-demand profiling off
+    PROFILING_SAMPLE_EVERY_N: int = int(os.getenv("PROFILING_SAMPLE_EVERY_N", "0"))  # 0 = off
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "/app/models/profiles")
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "1"))
+
+settings = Settings()
@@ -0,0 +1,82 @@
+"""
+Prometheus metrics for the Scribe engine, served at GET /metrics.
+Metric objects live here so every module records into the same registry.
+"""
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Latency buckets sized for ~1ms dict lookups up to multi-minute cold LLM generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "scribe_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+STOOQ_FETCH_SECONDS = Histogram(
+    "scribe_stooq_fetch_duration_seconds", "Market data download latency",
+    buckets=LATENCY_BUCKETS,
+)
+STOOQ_FETCH_ERRORS = Counter("scribe_stooq_fetch_errors_total", "Failed or empty market data downloads")
+OLLAMA_GENERATE_SECONDS = Histogram(
+    "scribe_ollama_generate_duration_seconds", "Ollama /api/generate latency",
+    ["purpose"], buckets=LATENCY_BUCKETS,
+)
+OLLAMA_TOKENS = Counter("scribe_ollama_tokens_total", "Tokens processed by Ollama", ["purpose", "kind"])
+OLLAMA_TOKENS_PER_SECOND = Histogram(
+    "scribe_ollama_decode_tokens_per_second", "Ollama completion throughput",
+    ["purpose"], buckets=(1, 2, 5, 10, 20, 40, 80, 160, 320),
+)
+OLLAMA_ERRORS = Counter("scribe_ollama_errors_total", "Failed Ollama generations", ["purpose"])
+OLLAMA_INVALID_OUTPUT = Counter(
+    "scribe_ollama_invalid_output_total", "Generations that did not validate against the forecast schema", ["purpose"],
+)
+LLM_BACKEND_REQUESTS = Counter(
+    "scribe_llm_backend_requests_total", "Generation attempts per LLM backend", ["backend", "outcome"],
+)
+LSTM_INFERENCE_SECONDS = Histogram(
+    "scribe_lstm_inference_duration_seconds", "LSTM forward pass latency",
+    ["model_version"], buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter("scribe_cache_requests_total", "Cache lookups", ["cache", "result"])
+IN_FLIGHT_REQUESTS = Gauge("scribe_in_flight_requests", "Forecast/chat requests and shadow validations running")
+REJECTED_REQUESTS = Counter(
+    "scribe_rejected_requests_total", "Requests turned away with 429 (busy), or shadow validations skipped", ["endpoint"],
+)
+
+
+def observe_ollama(purpose: str, seconds: float, body: dict):
+    """Records latency plus the token counters Ollama returns with every non-streamed response."""
+    OLLAMA_GENERATE_SECONDS.labels(purpose).observe(seconds)
+    prompt_tokens = body.get("prompt_eval_count") or 0
+    completion_tokens = body.get("eval_count") or 0
+    OLLAMA_TOKENS.labels(purpose, "prompt").inc(prompt_tokens)
+    OLLAMA_TOKENS.labels(purpose, "completion").inc(completion_tokens)
+    eval_ns = body.get("eval_duration") or 0
+    if completion_tokens and eval_ns:
+        OLLAMA_TOKENS_PER_SECOND.labels(purpose).observe(completion_tokens / (eval_ns / 1e9))
+
+
+def instrument_app(app: FastAPI):
+    """Adds per-route latency middleware and the /metrics endpoint."""
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Route template (e.g. /predict), not the raw path, to keep label cardinality bounded
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            if path != "/metrics":
+                HTTP_REQUEST_SECONDS.labels(request.method, path, str(status)).observe(
+                    time.perf_counter() - started
+                )
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,165 @@
+"""
+Opt-in per-request profiling for /predict and /chat.
+
+A request is profiled when either
+  - it carries `X-Scribe-Profile: 1` (or `?profile=1`) AND `X-Admin-Token: <PROFILING_ADMIN_TOKEN>`;
+    the profile summary is returned in the response under "profile", or
+  - it is every PROFILING_SAMPLE_EVERY_N-th request (0 = off); the profile is only stored.
+
+Each profiled request gets
+  - a phase breakdown (fetch / process / lstm_forecast / llm_forecast / ...) from `phase()`,
+  - a sampling profile (pyinstrument, if installed) written to PROFILING_DIR as
+    <timestamp>-<label>.speedscope.json, which opens directly in https://speedscope.app.
+"""
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.tracing import get_tracer
+
+tracer = get_tracer(__name__)
+
+PROFILE_HEADER = "X-Scribe-Profile"
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+_current_timer: ContextVar[Optional["PhaseTimer"]] = ContextVar("scribe_phase_timer", default=None)
+
+
+class PhaseTimer:
+    """Wall-clock time per named phase; repeated phases (e.g. per-day backtests) accumulate."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, Dict] = OrderedDict()
+
+    def add(self, name: str, seconds: float):
+        entry = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+
+    def summary(self) -> Dict:
+        total = time.perf_counter() - self.started
+        phases = [
+            {"name": name, "seconds": round(p["seconds"], 6), "calls": p["calls"],
+             "share": round(p["seconds"] / total, 4) if total else 0.0}
+            for name, p in self.phases.items()
+        ]
+        accounted = sum(p["seconds"] for p in self.phases.values())
+        return {
+            "total_seconds": round(total, 6),
+            "phases": phases,
+            "unaccounted_seconds": round(max(total - accounted, 0.0), 6),
+        }
+
+
+@contextmanager
+def phase(name: str, attributes: Optional[Dict] = None):
+    """
+    Tracing span `scribe.<name>` that is also timed into the current request's
+    PhaseTimer when the request is being profiled. Yields the span.
+    """
+    timer = _current_timer.get()
+    started = time.perf_counter()
+    with tracer.start_as_current_span(f"scribe.{name}", attributes=attributes) as span:
+        try:
+            yield span
+        finally:
+            if timer is not None:
+                timer.add(name, time.perf_counter() - started)
+
+
+class RequestProfiler:
+    def __init__(self, admin_token: str = "", sample_every_n: int = 0,
+                 output_dir: str = "/tmp/profiles", interval_seconds: float = 0.001):
+        self.admin_token = admin_token
+        self.sample_every_n = max(0, sample_every_n)
+        self.output_dir = output_dir
+        self.interval_seconds = interval_seconds
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def is_admin(self, request) -> bool:
+        token = request.headers.get(ADMIN_TOKEN_HEADER, "")
+        # No configured token means on-demand profiling is disabled, not open to everyone
+        # Compare bytes: compare_digest rejects non-ASCII str, which a client could send in the header
+        return bool(self.admin_token) and hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def mode_for(self, request) -> Optional[str]:
+        """'requested', 'sampled' or None."""
+        flag = request.headers.get(PROFILE_HEADER) or request.query_params.get("profile")
+        if flag and flag.lower() in ("1", "true", "yes") and self.is_admin(request):
+            return "requested"
+        if self.sample_every_n:
+            with self._lock:
+                self._count += 1
+                if self._count % self.sample_every_n == 0:
+                    return "sampled"
+        return None
+
+    def _start_sampler(self):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            return None
+        sampler = Profiler(interval=self.interval_seconds, async_mode="enabled")
+        sampler.start()
+        return sampler
+
+    def _save(self, sampler, label: str) -> Optional[str]:
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{label}.speedscope.json"
+        path = os.path.join(self.output_dir, name)
+        with open(path, "w") as f:
+            f.write(sampler.output(SpeedscopeRenderer()))
+        return path
+
+    async def run(self, request, label: str, func: Callable[..., Awaitable], *args, **kwargs):
+        mode = self.mode_for(request)
+        if mode is None:
+            return await func(*args, **kwargs)
+
+        timer = PhaseTimer()
+        token = _current_timer.set(timer)
+        sampler = self._start_sampler()
+        try:
+            result = await func(*args, **kwargs)
+        finally:
+            _current_timer.reset(token)
+            if sampler is not None:
+                sampler.stop()
+
+        report = {"mode": mode, "label": label, **timer.summary(), "profile_file": None}
+        if sampler is not None:
+            try:
+                report["profile_file"] = os.path.basename(self._save(sampler, label))
+            except Exception as e:
+                print(f"Profile Save Error: {e}")
+
+        print(f"Profiled {label} ({mode}): {report['total_seconds']:.3f}s "
+              + ", ".join(f"{p['name']}={p['seconds']:.3f}s" for p in report["phases"]))
+        if mode == "requested" and isinstance(result, dict):
+            result = {**result, "profile": report}
+        return result
+
+    def path_for(self, name: str) -> Optional[str]:
+        # Only bare file names from our own directory can be served
+        if os.path.basename(name) != name or not name.endswith(".speedscope.json"):
+            return None
+        path = os.path.join(self.output_dir, name)
+        return path if os.path.exists(path) else None
+
+
+profiler = RequestProfiler(
+    admin_token=settings.PROFILING_ADMIN_TOKEN,
+    sample_every_n=settings.PROFILING_SAMPLE_EVERY_N,
+    output_dir=settings.PROFILING_DIR,
+    interval_seconds=settings.PROFILING_INTERVAL_MS / 1000.0,
+)
@@ -0,0 +1,16 @@
+"""
+Lets STOOQ_URL point pandas_datareader's Stooq reader at another host
+(e.g. the benchmark suite's fake Stooq). Unset = the real https://stooq.com/q/d/l/.
+"""
+import os
+from pandas_datareader.stooq import StooqDailyReader
+
+STOOQ_URL = os.getenv("STOOQ_URL")
+
+
+def configure_stooq(url: str = STOOQ_URL):
+    if url:
+        StooqDailyReader.url = property(lambda self: url)
+
+
+configure_stooq()
@@ -1,9 +1,18 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse
+from app.core.config import settings
+from app.core.metrics import instrument_app
+from app.core.profiling import profiler
+from app.core.tracing import setup_tracing
+from app.services.admission import InFlightLimiter
 from app.services.engine import ScribeEngine
 from pydantic import BaseModel
 
 app = FastAPI(title="Scribe LLM Engine", version="1.0.0")
+instrument_app(app)
+setup_tracing("finwise-scribe", app=app)
 engine = ScribeEngine()
+limiter = InFlightLimiter(settings.MAX_IN_FLIGHT, settings.BUSY_RETRY_AFTER_SECONDS)
 
 class PredictionRequest(BaseModel):
     symbol: str
@@ -14,12 +23,45 @@ class ChatRequest(BaseModel):
 
 @app.get("/")
 def health():
-    return {"status": "Scribe Engine Operational"}
+    # Backends not cooling down after repeated failures, in failover order
+    return {"status": "Scribe Engine Operational", "llm_backends": [b.name for b in engine.llm.available()]}
 
 @app.post("/predict")
-async def predict_next_move(request: PredictionRequest):
-    return await engine.predict(request.symbol)
+async def predict_next_move(request: PredictionRequest, background_tasks: BackgroundTasks, http_request: Request):
+    if not limiter.try_acquire("predict"):
+        return busy_response()
+    try:
+        # Shadow validation (if sampled) runs after the forecast has been returned, in its own
+        # limiter slot so its LLM calls stay within SCRIBE_MAX_IN_FLIGHT
+        def schedule(func, *args, **kwargs):
+            background_tasks.add_task(limiter.run_if_free, "shadow_validation", func, *args, **kwargs)
+
+        return await profiler.run(http_request, "predict", engine.predict, request.symbol, schedule=schedule)
+    finally:
+        limiter.release()
 
 @app.post("/chat")
-async def chat_with_agent(request: ChatRequest):
-    return await engine.chat(request.message, request.symbol)
\ No newline at end of file
+async def chat_with_agent(request: ChatRequest, http_request: Request):
+    if not limiter.try_acquire("chat"):
+        return busy_response()
+    try:
+        return await profiler.run(http_request, "chat", engine.chat, request.message, request.symbol)
+    finally:
+        limiter.release()
+
+def busy_response():
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Scribe engine busy", "in_flight": limiter.in_flight},
+        headers={"Retry-After": str(limiter.retry_after_seconds)},
+    )
+
+@app.get("/debug/profiles/{name}")
+def download_profile(name: str, http_request: Request):
+    """Stored speedscope profile (admin token required)."""
+    if not profiler.is_admin(http_request):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    path = profiler.path_for(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json")
@@ -0,0 +1,188 @@
+"""
+Offline walk-forward backtest for the LSTM baseline.
+
+Every bar after the first `sequence_length` feature rows becomes one test case:
+the model sees the preceding window and predicts the next [P_Change, V_Change].
+Windows are strided views, inference is batched, and metrics are pure NumPy.
+
+Usage:
+    python -m app.ml.backtest --tickers MSFT.US AAPL.US --period 5y --out /app/models/backtest.json
+    python -m app.ml.backtest --data-dir ./csv --tickers MSFT AAPL      # offline, <TICKER>.csv files
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import joblib
+
+# Add /app to python path
+sys.path.append("/app")
+
+from typing import Dict, List
+from app.ml.market_data import MarketDataCache, fetch_many
+from app.ml.windowing import compute_features, sliding_windows
+from app.ml.vocabulary import (
+    COMPOSITE_TOKENS, P_LEVELS, V_LEVELS, V_TOKENS,
+    price_token_ids, volume_token_ids,
+)
+
+N_TOKENS = len(COMPOSITE_TOKENS)
+
+
+def compute_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
+    """
+    Args:
+        y_true, y_pred: (n, 2) arrays of actual / predicted [P_Change, V_Change].
+    """
+    true_p, true_v = price_token_ids(y_true[:, 0]), volume_token_ids(y_true[:, 1])
+    pred_p, pred_v = price_token_ids(y_pred[:, 0]), volume_token_ids(y_pred[:, 1])
+    true_c = true_p * len(V_TOKENS) + true_v
+    pred_c = pred_p * len(V_TOKENS) + pred_v
+
+    n = len(true_c)
+    if n == 0:
+        return {"samples": 0}
+
+    # Rows: actual token, Columns: predicted token
+    confusion = np.bincount(true_c * N_TOKENS + pred_c, minlength=N_TOKENS * N_TOKENS)
+    confusion = confusion.reshape(N_TOKENS, N_TOKENS)
+    support = confusion.sum(axis=1)
+    per_token_recall = np.divide(
+        np.diag(confusion), support, out=np.full(N_TOKENS, np.nan), where=support > 0
+    )
+
+    return {
+        "samples": int(n),
+        "hit_rate": float(np.mean(true_c == pred_c)),
+        "price_hit_rate": float(np.mean(true_p == pred_p)),
+        "volume_hit_rate": float(np.mean(true_v == pred_v)),
+        "direction_hit_rate": float(np.mean(np.sign(y_true[:, 0]) == np.sign(y_pred[:, 0]))),
+        "price_rmse": float(np.sqrt(np.mean((y_true[:, 0] - y_pred[:, 0]) ** 2))),
+        "volume_rmse": float(np.sqrt(np.mean((y_true[:, 1] - y_pred[:, 1]) ** 2))),
+        # Ordinal distance between tokens (e.g. P_SURGE vs P_HIGH = 1 step)
+        "price_token_rmse": float(np.sqrt(np.mean((P_LEVELS[true_p] - P_LEVELS[pred_p]) ** 2))),
+        "volume_token_rmse": float(np.sqrt(np.mean((V_LEVELS[true_v] - V_LEVELS[pred_v]) ** 2))),
+        "per_token_recall": {
+            tok: float(r) for tok, r, s in zip(COMPOSITE_TOKENS, per_token_recall, support) if s > 0
+        },
+        "confusion_matrix": confusion.tolist(),
+    }
+
+
+class LSTMBacktester:
+    def __init__(self, model, scaler, sequence_length: int = 60, batch_size: int = 4096):
+        self.model = model
+        self.scaler = scaler
+        self.sequence_length = sequence_length
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_artifacts(cls, model_dir: str = "/app/models", **kwargs):
+        # Imported lazily so metric helpers stay usable without TensorFlow
+        os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+        from tensorflow.keras.models import load_model
+
+        model = load_model(os.path.join(model_dir, "lstm_baseline.h5"), compile=False)
+        scaler = joblib.load(os.path.join(model_dir, "lstm_scaler.joblib"))
+        return cls(model, scaler, **kwargs)
+
+    def predict_features(self, features: np.ndarray):
+        """
+        Walk-forward predictions for one ticker.
+        Returns (y_true, y_pred), each (n_bars - sequence_length, 2) in unscaled units.
+        """
+        if len(features) <= self.sequence_length:
+            empty = np.empty((0, features.shape[1]))
+            return empty, empty
+
+        scaled = self.scaler.transform(features)
+        # Window i covers rows [i, i + L) and predicts row i + L, so the final row is never an input
+        windows = sliding_windows(scaled[:-1], self.sequence_length)
+        pred_scaled = self.model.predict(windows, batch_size=self.batch_size, verbose=0)
+
+        y_pred = self.scaler.inverse_transform(pred_scaled)
+        y_true = features[self.sequence_length:]
+        return y_true, y_pred
+
+    def run(self, raw_data: Dict[str, pd.DataFrame]) -> Dict:
+        start_time = time.time()
+        per_ticker = {}
+        all_true, all_pred = [], []
+
+        for ticker, df in raw_data.items():
+            if df.empty:
+                print(f"Skipping {ticker}: no data")
+                continue
+            features = compute_features(df).values
+            y_true, y_pred = self.predict_features(features)
+            if len(y_true) == 0:
+                print(f"Skipping {ticker}: fewer than {self.sequence_length + 1} bars")
+                continue
+
+            metrics = compute_metrics(y_true, y_pred)
+            metrics.pop("confusion_matrix")
+            per_ticker[ticker] = metrics
+            all_true.append(y_true)
+            all_pred.append(y_pred)
+
+        if not all_true:
+            raise ValueError("No ticker had enough data to backtest.")
+
+        overall = compute_metrics(np.vstack(all_true), np.vstack(all_pred))
+        return {
+            "sequence_length": self.sequence_length,
+            "tokens": COMPOSITE_TOKENS,
+            "overall": overall,
+            "per_ticker": per_ticker,
+            "elapsed_seconds": time.time() - start_time,
+        }
+
+
+def load_raw_data(tickers: List[str], period: str, data_dir: str = None) -> Dict[str, pd.DataFrame]:
+    if not data_dir:
+        return fetch_many(tickers, period=period, cache=MarketDataCache())
+
+    data = {}
+    for ticker in tickers:
+        path = os.path.join(data_dir, f"{ticker}.csv")
+        data[ticker] = pd.read_csv(path, index_col=0, parse_dates=True).sort_index()
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the LSTM baseline.")
+    parser.add_argument("--tickers", nargs="+", required=True)
+    parser.add_argument("--period", default="5y", help="History to fetch from Stooq, e.g. 5y, 10y")
+    parser.add_argument("--data-dir", default=None, help="Read <TICKER>.csv files instead of Stooq")
+    parser.add_argument("--model-dir", default="/app/models")
+    parser.add_argument("--sequence-length", type=int, default=60)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--out", default=None, help="Write the full JSON report here")
+    args = parser.parse_args(argv)
+
+    raw_data = load_raw_data(args.tickers, args.period, args.data_dir)
+    backtester = LSTMBacktester.from_artifacts(
+        args.model_dir, sequence_length=args.sequence_length, batch_size=args.batch_size
+    )
+    report = backtester.run(raw_data)
+
+    overall = report["overall"]
+    print(f"--- LSTM Backtest ({len(report['per_ticker'])} tickers, {overall['samples']} windows) ---")
+    print(f"Hit Rate (composite): {overall['hit_rate']:.4f}")
+    print(f"Hit Rate (price/volume): {overall['price_hit_rate']:.4f} / {overall['volume_hit_rate']:.4f}")
+    print(f"Direction Hit Rate: {overall['direction_hit_rate']:.4f}")
+    print(f"Token RMSE (price/volume): {overall['price_token_rmse']:.4f} / {overall['volume_token_rmse']:.4f}")
+    print(f"Elapsed: {report['elapsed_seconds']:.2f}s")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Concurrent, resumable evaluation of the Scribe SLM on next-token prediction.
+
+Each test step (a 60-token context window) is sent to an Ollama-compatible endpoint
+with bounded parallelism. Finished steps are appended to a JSONL checkpoint keyed by
+(model, prompt), so an interrupted or repeated run only evaluates what is missing.
+
+Usage:
+    python -m app.ml.evaluate_slm --ticker MSFT.US --backend ollama --url http://ollama:11434
+    python -m app.ml.evaluate_slm --ticker MSFT --data-dir ./csv --backend fake   # fully offline
+    python -m app.ml.evaluate_slm --ticker MSFT.US --encoding short_rle           # compact prompts
+
+Compare encodings on the same steps by their hit_rate and prefill_* figures
+(Ollama's prompt_eval_count / prompt_eval_duration).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import httpx
+import numpy as np
+import pandas as pd
+
+# Add /app to python path
+sys.path.append("/app")
+
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.ml.symbolizer import FinwiseSymbolizer
+from app.ml.backtest import load_raw_data
+from app.ml.sequence_encoding import ENCODINGS, encoding_for_model
+from app.schemas.forecast import FORECAST_SCHEMA, parse_forecast
+from app.services.prompts import PromptBuilder
+
+CONTEXT_WINDOW_SIZE = 60
+TEST_SPLIT_RATIO = 0.8
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+def parse_prediction(raw: str) -> str:
+    forecast = parse_forecast(raw)
+    return forecast.prediction if forecast is not None else "ERROR"
+
+
+class ResultCache:
+    """Append-only JSONL checkpoint. One line per finished step, loaded on start-up."""
+    def __init__(self, path: str):
+        self.path = path
+        self._results: Dict[str, Dict] = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from an interrupted run
+                    self._results[record["key"]] = record
+        self._file = open(path, "a")
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\x00{prompt}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self._results.get(key)
+
+    def put(self, record: Dict):
+        self._results[record["key"]] = record
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __len__(self):
+        return len(self._results)
+
+
+class ParallelSLMEvaluator:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        cache: ResultCache,
+        model: str = settings.MODEL_NAME,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        encoding: str = "verbose",
+        symbol: str = "",
+    ):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.encoding = encoding
+        self.symbol = symbol
+        # Same template as ScribeEngine's forecast/validation prompts; steps are already 60-bar windows
+        self.prompts = PromptBuilder(encoding)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_retries = max_retries
+
+    async def _generate(self, prompt: str) -> Dict:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "format": FORECAST_SCHEMA,
+            "options": {"temperature": 0.1, "num_predict": settings.LLM_NUM_PREDICT},
+        }
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.client.post("/api/generate", json=payload)
+                if response.status_code in RETRY_STATUSES:
+                    raise httpx.HTTPStatusError("retryable", request=response.request, response=response)
+                response.raise_for_status()
+                return response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code not in RETRY_STATUSES:
+                    raise
+                if attempt == self.max_retries - 1:
+                    raise
+                # Exponential backoff with a small cap; only failing requests wait
+                await asyncio.sleep(min(0.5 * 2 ** attempt, 8.0))
+
+    async def evaluate_step(self, step: Dict) -> Dict:
+        prompt = self.prompts.forecast(step["context"], self.symbol, size=None)
+        key = ResultCache.make_key(self.model, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        async with self.semaphore:
+            started = time.perf_counter()
+            try:
+                body = await self._generate(prompt)
+                prediction = parse_prediction(body.get("response", "{}"))
+                error = None
+            except Exception as e:
+                body, prediction, error = {}, "ERROR", str(e)
+            latency = time.perf_counter() - started
+
+        record = {
+            "key": key,
+            "date": step["date"],
+            "target": step["target"],
+            "prediction": prediction,
+            "latency_s": latency,
+            "prompt_eval_count": body.get("prompt_eval_count"),
+            "prompt_eval_duration_s": (body.get("prompt_eval_duration") or 0) / 1e9,
+            "eval_count": body.get("eval_count"),
+        }
+        # Transport failures are not checkpointed, so a rerun retries them
+        if error is None:
+            self.cache.put(record)
+        return {**record, "cached": False, "error": error}
+
+    async def run(self, steps: List[Dict]) -> List[Dict]:
+        tasks = [asyncio.create_task(self.evaluate_step(step)) for step in steps]
+        results = []
+        for i, task in enumerate(asyncio.as_completed(tasks), start=1):
+            results.append(await task)
+            if i % 50 == 0 or i == len(tasks):
+                print(f"Step {i} / {len(tasks)}...")
+        return results
+
+
+def build_steps(raw_df: pd.DataFrame, context_size: int = CONTEXT_WINDOW_SIZE,
+                test_split: float = TEST_SPLIT_RATIO, limit: int = None):
+    """Returns (steps, token_to_value) for the test split of one ticker."""
+    data, _, tokens = FinwiseSymbolizer().process(raw_df)
+    split_index = max(int(len(data) * test_split), context_size)
+
+    # De-quantization mapper: mean price change per token on the training split
+    train = data.iloc[:split_index]
+    token_to_value = train.groupby('Token')['P_Change'].mean().to_dict()
+
+    token_list = tokens.tolist()
+    steps = []
+    for i in range(split_index, len(data)):
+        steps.append({
+            "date": data.index[i].strftime("%Y-%m-%d"),
+            "context": token_list[i - context_size:i],
+            "target": token_list[i],
+            "actual_change": float(data['P_Change'].iloc[i]),
+        })
+    if limit:
+        steps = steps[:limit]
+    return steps, token_to_value
+
+
+def summarize(steps: List[Dict], results: List[Dict], token_to_value: Dict) -> Dict:
+    by_date = {r["date"]: r for r in results}
+    ordered = [by_date[s["date"]] for s in steps]
+    predicted = np.array([r["prediction"] for r in ordered])
+    targets = np.array([s["target"] for s in steps])
+    actual = np.array([s["actual_change"] for s in steps])
+    predicted_value = np.array([token_to_value.get(p, 0.0) for p in predicted])
+    latencies = np.array([r["latency_s"] for r in ordered if not r["cached"]])
+    # Prefill cost as reported by Ollama; cached steps keep the figures from their original run
+    prefill_tokens = np.array([r["prompt_eval_count"] for r in ordered if r.get("prompt_eval_count")])
+    prefill_s = np.array([r["prompt_eval_duration_s"] for r in ordered if r.get("prompt_eval_duration_s")])
+
+    return {
+        "steps": len(steps),
+        "cached_steps": int(sum(r["cached"] for r in ordered)),
+        "errors": int(sum(1 for r in ordered if r.get("error"))),
+        "hit_rate": float(np.mean(predicted == targets)) if len(steps) else 0.0,
+        "rmse": float(np.sqrt(np.mean((actual - predicted_value) ** 2))) if len(steps) else 0.0,
+        "latency_p50_s": float(np.percentile(latencies, 50)) if len(latencies) else None,
+        "latency_p95_s": float(np.percentile(latencies, 95)) if len(latencies) else None,
+        "prefill_tokens_mean": float(np.mean(prefill_tokens)) if len(prefill_tokens) else None,
+        "prefill_p50_s": float(np.percentile(prefill_s, 50)) if len(prefill_s) else None,
+    }
+
+
+def make_client(backend: str, url: str, timeout: float) -> httpx.AsyncClient:
+    if backend == "fake":
+        from app.fakes.ollama import app as fake_app
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_app), base_url="http://fake-ollama")
+    return httpx.AsyncClient(base_url=url, timeout=httpx.Timeout(timeout, connect=5.0))
+
+
+async def evaluate(args) -> Dict:
+    raw_df = load_raw_data([args.ticker], args.period, args.data_dir)[args.ticker]
+    if raw_df.empty:
+        raise ValueError(f"No data for {args.ticker}")
+    steps, token_to_value = build_steps(raw_df, test_split=args.test_split, limit=args.limit)
+
+    encoding = args.encoding or encoding_for_model(
+        args.model, settings.MODEL_SEQUENCE_ENCODINGS, settings.SEQUENCE_ENCODING
+    )
+    # Verbose keeps the original file name so existing checkpoints are reused
+    suffix = "" if encoding == "verbose" else f"_{encoding}"
+    cache_path = args.cache or os.path.join(
+        args.cache_dir, f"{args.ticker}_{args.model}_{args.backend}{suffix}.jsonl"
+    )
+    cache = ResultCache(cache_path)
+    print(f"Evaluating {len(steps)} steps with '{encoding}' sequences "
+          f"({len(cache)} results already checkpointed in {cache_path})")
+
+    started = time.perf_counter()
+    async with make_client(args.backend, args.url, args.timeout) as client:
+        evaluator = ParallelSLMEvaluator(
+            client, cache, model=args.model, concurrency=args.concurrency,
+            encoding=encoding, symbol=args.ticker,
+        )
+        try:
+            results = await evaluator.run(steps)
+        finally:
+            cache.close()
+
+    summary = summarize(steps, results, token_to_value)
+    summary["encoding"] = encoding
+    summary["elapsed_seconds"] = time.perf_counter() - started
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel, resumable SLM next-token evaluation.")
+    parser.add_argument("--ticker", required=True)
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--data-dir", default=None, help="Read <TICKER>.csv instead of Stooq")
+    parser.add_argument("--backend", choices=["ollama", "fake"], default="ollama")
+    parser.add_argument("--url", default=settings.OLLAMA_URL)
+    parser.add_argument("--model", default=settings.MODEL_NAME)
+    parser.add_argument("--encoding", choices=ENCODINGS, default=None,
+                        help="Sequence encoding for prompts (default: the model's configured encoding)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--test-split", type=float, default=TEST_SPLIT_RATIO)
+    parser.add_argument("--limit", type=int, default=None, help="Evaluate only the first N test steps")
+    parser.add_argument("--cache-dir", default="/app/models/eval_cache")
+    parser.add_argument("--cache", default=None, help="Explicit checkpoint file (overrides --cache-dir)")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(evaluate(args))
+
+    print("\n--- Evaluation Complete ---")
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
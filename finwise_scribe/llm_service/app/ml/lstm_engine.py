@@ -3,38 +3,126 @@ import numpy as np
 import pandas as pd
 import joblib
 import logging
+import random
+import threading
+import time
 # Suppress TF logs
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 import tensorflow as tf
 from tensorflow.keras.models import load_model
+from app.core.config import settings
+from app.core.metrics import LSTM_INFERENCE_SECONDS
+from app.ml.registry import ModelRegistry, ROLES
 from app.ml.symbolizer import FinwiseSymbolizer
+from app.ml.windowing import compute_features
 
 logger = logging.getLogger("uvicorn")
 
+class ModelBundle:
+    """An immutable (model, scaler) pair. Swapped as a whole so a request never mixes versions."""
+    __slots__ = ("version", "model", "scaler")
+
+    def __init__(self, version: str, model, scaler):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+
 class LSTMEngine:
-    def __init__(self, sequence_length: int = 60):
+    def __init__(self, sequence_length: int = 60, model_dir: str = settings.LSTM_MODEL_DIR,
+                 reload_interval: float = settings.LSTM_RELOAD_INTERVAL_SECONDS,
+                 candidate_fraction: float = settings.LSTM_CANDIDATE_FRACTION):
         self.sequence_length = sequence_length
-        self.model_dir = "/app/models" 
-        self.model_path = os.path.join(self.model_dir, "lstm_baseline.h5")
-        self.scaler_path = os.path.join(self.model_dir, "lstm_scaler.joblib")
-        
-        self.model = None
-        self.scaler = None
+        self.model_dir = model_dir
+        self.registry = ModelRegistry(self.model_dir)
+        self.reload_interval = reload_interval
+        self.candidate_fraction = candidate_fraction
+
+        # role -> ModelBundle. Replaced wholesale (atomic reference swap), never mutated.
+        self._bundles = {}
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+
         self._load_resources()
+        if self.reload_interval > 0:
+            self.start_watcher()
 
-    def _load_resources(self):
-        try:
-            if os.path.exists(self.model_path):
-                # FIXED: compile=False prevents the "metrics" deserialization error
-                self.model = load_model(self.model_path, compile=False)
-                logger.info(f"LSTM: Model loaded successfully from {self.model_path}")
-            
-            if os.path.exists(self.scaler_path):
-                self.scaler = joblib.load(self.scaler_path)
-                logger.info("LSTM: Scaler loaded.")
-                
-        except Exception as e:
-            logger.error(f"LSTM Load Error: {e}")
+    @property
+    def model(self):
+        bundle = self._bundles.get("current")
+        return bundle.model if bundle else None
+
+    @property
+    def scaler(self):
+        bundle = self._bundles.get("current")
+        return bundle.scaler if bundle else None
+
+    @property
+    def versions(self):
+        return {role: bundle.version for role, bundle in self._bundles.items()}
+
+    def _load_bundle(self, version: str) -> ModelBundle:
+        model_path, scaler_path = self.registry.artifact_paths(version)
+        # FIXED: compile=False prevents the "metrics" deserialization error
+        model = load_model(model_path, compile=False)
+        scaler = joblib.load(scaler_path)
+        logger.info(f"LSTM: Loaded version '{version}' from {model_path}")
+        return ModelBundle(version, model, scaler)
+
+    def _load_resources(self) -> bool:
+        """
+        Resolves the current/candidate versions and loads any that changed.
+        Loading happens before the swap, so in-flight requests keep their bundle.
+        Returns True if the served versions changed.
+        """
+        with self._reload_lock:
+            old = self._bundles
+            new = {}
+            for role in ROLES:
+                version = self.registry.resolve(role)
+                if version is None:
+                    continue
+                if role in old and old[role].version == version:
+                    new[role] = old[role]
+                    continue
+                try:
+                    new[role] = self._load_bundle(version)
+                except Exception as e:
+                    logger.error(f"LSTM Load Error ({role}={version}): {e}")
+                    if role in old:
+                        new[role] = old[role]  # Keep serving the previous version
+
+            changed = {r: b.version for r, b in new.items()} != {r: b.version for r, b in old.items()}
+            if changed:
+                self._bundles = new
+                logger.info(f"LSTM: Serving versions {self.versions}")
+            return changed
+
+    def start_watcher(self):
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="lstm-model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop_event.set()
+
+    def _watch(self):
+        while not self._stop_event.wait(self.reload_interval):
+            try:
+                self._load_resources()
+            except Exception as e:
+                logger.error(f"LSTM Watcher Error: {e}")
+
+    def _select_bundle(self, version: str = None):
+        bundles = self._bundles  # Single read: the whole request uses this snapshot
+        if version is not None:
+            return next((b for b in bundles.values() if b.version == version), None)
+        candidate = bundles.get("candidate")
+        if candidate is not None and random.random() < self.candidate_fraction:
+            return candidate
+        return bundles.get("current")
 
     def _get_token_from_values(self, p_change, v_change):
         """
@@ -57,15 +145,18 @@ class LSTMEngine:
 
         return f"{p_token}_{v_token}"
 
-    def predict(self, symbol: str, data_override: pd.DataFrame = None):
+    def predict(self, symbol: str, data_override: pd.DataFrame = None, version: str = None):
         """
         Args:
             symbol: Ticker symbol
             data_override: Optional DataFrame. If provided, uses this data 
                            instead of fetching new data. 
                            Used for Backtesting/Validation loops.
+            version: Optional model version to pin (e.g. to compare A/B arms).
+                     By default, LSTM_CANDIDATE_FRACTION of calls go to the candidate.
         """
-        if self.model is None or self.scaler is None:
+        bundle = self._select_bundle(version)
+        if bundle is None:
             return {"error": "Model/Scaler not loaded."}
 
         try:
@@ -80,25 +171,23 @@ class LSTMEngine:
                 return {"error": f"No data for {symbol}"}
 
             # 2. Process Features
-            df = pd.DataFrame()
-            df['P_Change'] = raw_data['Close'].pct_change()
-            df['V_Change'] = raw_data['Volume'].pct_change()
-            df.replace([np.inf, -np.inf], np.nan, inplace=True)
-            df.dropna(inplace=True)
+            df = compute_features(raw_data)
 
             if len(df) < self.sequence_length:
                 return {"error": "Insufficient data length."}
 
             # 3. Create Sequence (Last 60 of the provided data)
             last_sequence = df.tail(self.sequence_length).values
-            last_sequence_scaled = self.scaler.transform(last_sequence)
+            last_sequence_scaled = bundle.scaler.transform(last_sequence)
             input_tensor = last_sequence_scaled.reshape(1, self.sequence_length, 2)
 
             # 4. Predict
-            prediction_scaled = self.model.predict(input_tensor, verbose=0)
+            started = time.perf_counter()
+            prediction_scaled = bundle.model.predict(input_tensor, verbose=0)
+            LSTM_INFERENCE_SECONDS.labels(bundle.version).observe(time.perf_counter() - started)
             
             # 5. Inverse Transform
-            prediction_actual = self.scaler.inverse_transform(prediction_scaled)[0]
+            prediction_actual = bundle.scaler.inverse_transform(prediction_scaled)[0]
             pred_p_change = prediction_actual[0]
             pred_v_change = prediction_actual[1]
 
@@ -110,7 +199,8 @@ class LSTMEngine:
                 "predicted_change_pct": float(pred_p_change),
                 "predicted_vol_change": float(pred_v_change),
                 "prediction_token": token,
-                "model": "LSTM_Dual_Output"
+                "model": "LSTM_Dual_Output",
+                "model_version": bundle.version
             }
 
         except Exception as e:
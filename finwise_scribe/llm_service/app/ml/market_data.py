@@ -0,0 +1,138 @@
+import os
+import time
+import threading
+import pandas as pd
+import pandas_datareader.data as web
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.core.metrics import CACHE_REQUESTS, STOOQ_FETCH_SECONDS, STOOQ_FETCH_ERRORS
+from app.ml.symbolizer import FinwiseSymbolizer
+
+DEFAULT_CACHE_DIR = os.getenv("MARKET_DATA_CACHE_DIR", "/app/models/market_cache")
+DEFAULT_CACHE_TTL_HOURS = float(os.getenv("MARKET_DATA_CACHE_TTL_HOURS", "12"))
+# Re-fetch a few days behind the cached tail so late corrections from Stooq are picked up
+REFRESH_OVERLAP_DAYS = 5
+
+
+class RateLimiter:
+    """Thread-safe minimum spacing between outbound requests."""
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if self.interval == 0.0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class MarketDataCache:
+    """
+    On-disk OHLCV cache, one pickle per ticker.
+    Stale entries are topped up with only the bars since the cached tail.
+    """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_hours: float = DEFAULT_CACHE_TTL_HOURS):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_hours * 3600
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, ticker: str) -> str:
+        safe = ticker.upper().replace("/", "_")
+        return os.path.join(self.cache_dir, f"{safe}.pkl")
+
+    def load(self, ticker: str) -> Optional[pd.DataFrame]:
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            print(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def is_fresh(self, ticker: str) -> bool:
+        path = self._path(ticker)
+        return os.path.exists(path) and (time.time() - os.path.getmtime(path)) < self.ttl_seconds
+
+    def save(self, ticker: str, df: pd.DataFrame):
+        # Write-then-rename so concurrent readers never see a partial file
+        path = self._path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+
+def _download(ticker: str, start: datetime) -> pd.DataFrame:
+    try:
+        with STOOQ_FETCH_SECONDS.time():
+            data = web.DataReader(ticker, 'stooq', start=start)
+    except Exception:
+        STOOQ_FETCH_ERRORS.inc()
+        raise
+    # CRITICAL: Stooq returns data newest-first. We need oldest-first.
+    return data.sort_index(ascending=True)
+
+
+def fetch_ticker(ticker: str, period: str = "5y", cache: Optional[MarketDataCache] = None,
+                 limiter: Optional[RateLimiter] = None) -> pd.DataFrame:
+    start = FinwiseSymbolizer(tickers=[ticker], period=period)._get_start_date()
+
+    cached = cache.load(ticker) if cache else None
+    # A ticker may have listed after `start`, so coverage is judged by what was requested
+    covers_period = (
+        cached is not None and not cached.empty
+        and cached.attrs.get("requested_start", cached.index[0]) <= start + timedelta(days=7)
+    )
+    if covers_period:
+        if cache.is_fresh(ticker):
+            CACHE_REQUESTS.labels("market_data", "hit").inc()
+            return cached.loc[cached.index >= start]
+        CACHE_REQUESTS.labels("market_data", "topup").inc()
+
+        # Top up: only download the tail instead of the whole period
+        if limiter:
+            limiter.wait()
+        tail = _download(ticker, cached.index[-1] - timedelta(days=REFRESH_OVERLAP_DAYS))
+        merged = pd.concat([cached, tail])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        merged.attrs["requested_start"] = cached.attrs.get("requested_start", cached.index[0])
+        cache.save(ticker, merged)
+        return merged.loc[merged.index >= start]
+
+    if cache:
+        CACHE_REQUESTS.labels("market_data", "miss").inc()
+    if limiter:
+        limiter.wait()
+    data = _download(ticker, start)
+    data.attrs["requested_start"] = start
+    if cache and not data.empty:
+        cache.save(ticker, data)
+    return data
+
+
+def fetch_many(tickers: List[str], period: str = "5y", max_workers: int = 8,
+               requests_per_second: float = 4.0, cache: Optional[MarketDataCache] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Fetches tickers concurrently (threads: the work is network-bound) under a shared rate limit.
+    Failed tickers map to an empty DataFrame, mirroring FinwiseSymbolizer.fetch_data.
+    """
+    limiter = RateLimiter(requests_per_second)
+
+    def _safe_fetch(ticker):
+        try:
+            return fetch_ticker(ticker, period, cache, limiter)
+        except Exception as e:
+            print(f"Error fetching data for {ticker}: {e}")
+            return pd.DataFrame()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        frames = list(pool.map(_safe_fetch, tickers))
+    return dict(zip(tickers, frames))
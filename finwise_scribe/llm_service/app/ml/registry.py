@@ -0,0 +1,128 @@
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+MODEL_FILE = "lstm_baseline.h5"
+SCALER_FILE = "lstm_scaler.joblib"
+META_FILE = "lstm_baseline.meta.json"
+LEGACY_VERSION = "legacy"
+ROLES = ("current", "candidate")
+# Generated names: v<date>-<time>, plus -N when several publishes share a second
+VERSION_NAME = re.compile(r"^(v\d{8}-\d{6})(?:-(\d+))?$")
+
+
+def _version_sort_key(version: str) -> Tuple[str, int]:
+    # Oldest first; same-second suffixes compare as numbers so "-10" sorts after "-2"
+    match = VERSION_NAME.match(version)
+    if match is None:
+        return version, 0
+    return match.group(1), int(match.group(2) or 0)
+
+
+class ModelRegistry:
+    """
+    Directory-backed registry of LSTM artifacts.
+
+        <root>/versions/<version>/{lstm_baseline.h5, lstm_scaler.joblib, lstm_baseline.meta.json}
+        <root>/CURRENT      name of the version serving traffic
+        <root>/CANDIDATE    optional version receiving an A/B fraction of traffic
+        <root>/.staging/    publishes in progress, renamed into versions/ once complete
+
+    The flat layout (<root>/lstm_baseline.h5) written by older trainers is served as
+    version "legacy" until something is published.
+    """
+    def __init__(self, root: str = "/app/models"):
+        self.root = root
+        self.versions_dir = os.path.join(root, "versions")
+        self.staging_dir = os.path.join(root, ".staging")
+
+    def _pointer_path(self, role: str) -> str:
+        if role not in ROLES:
+            raise ValueError(f"Unknown model role '{role}'. Expected one of {ROLES}")
+        return os.path.join(self.root, role.upper())
+
+    def list_versions(self) -> List[str]:
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            (
+                v for v in os.listdir(self.versions_dir)
+                # "<v>.staging" directories are left over from publishes that staged inside versions/
+                if not v.endswith(".staging") and os.path.exists(os.path.join(self.versions_dir, v, MODEL_FILE))
+            ),
+            key=_version_sort_key,
+        )
+
+    def resolve(self, role: str = "current") -> Optional[str]:
+        pointer = self._pointer_path(role)
+        if os.path.exists(pointer):
+            with open(pointer) as f:
+                version = f.read().strip()
+            if version in self.list_versions():
+                return version
+
+        if role == "candidate":
+            return None
+        # No (valid) pointer: newest published version, then the flat legacy files
+        versions = self.list_versions()
+        if versions:
+            return versions[-1]
+        if os.path.exists(os.path.join(self.root, MODEL_FILE)):
+            return LEGACY_VERSION
+        return None
+
+    def artifact_paths(self, version: str) -> Tuple[str, str]:
+        base = self.root if version == LEGACY_VERSION else os.path.join(self.versions_dir, version)
+        return os.path.join(base, MODEL_FILE), os.path.join(base, SCALER_FILE)
+
+    def publish(self, model_path: str, scaler_path: str, meta_path: str = None,
+                version: str = None, role: Optional[str] = "current") -> str:
+        """
+        Copies artifacts into a new immutable version directory and optionally points a role at it.
+        Generated version names get a -1, -2, ... suffix when another publish took the same second.
+        """
+        os.makedirs(self.staging_dir, exist_ok=True)
+        os.makedirs(self.versions_dir, exist_ok=True)
+        base = version or datetime.utcnow().strftime("v%Y%m%d-%H%M%S")
+        staging = tempfile.mkdtemp(prefix=f"{base}-", dir=self.staging_dir)
+        try:
+            shutil.copy2(model_path, os.path.join(staging, MODEL_FILE))
+            shutil.copy2(scaler_path, os.path.join(staging, SCALER_FILE))
+            if meta_path and os.path.exists(meta_path):
+                shutil.copy2(meta_path, os.path.join(staging, META_FILE))
+            # Rename last so watchers never see a half-copied version
+            version = self._commit_staging(staging, base, unique=version is None)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if role:
+            self.promote(version, role)
+        return version
+
+    def _commit_staging(self, staging: str, base: str, unique: bool) -> str:
+        for attempt in range(1000 if unique else 1):
+            version = f"{base}-{attempt}" if attempt else base
+            try:
+                # os.rename refuses a non-empty target, so concurrent publishes cannot merge
+                os.rename(staging, os.path.join(self.versions_dir, version))
+                return version
+            except OSError:
+                if not os.path.exists(os.path.join(self.versions_dir, version)):
+                    raise
+        raise FileExistsError(f"Model version '{base}' already exists")
+
+    def promote(self, version: str, role: str = "current"):
+        pointer = self._pointer_path(role)
+        tmp_path = f"{pointer}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, pointer)
+
+    def clear(self, role: str = "candidate"):
+        pointer = self._pointer_path(role)
+        if os.path.exists(pointer):
+            os.remove(pointer)
@@ -0,0 +1,95 @@
+"""
+Compact encodings for the composite-token sequences sent to the LLM.
+
+A 60-bar history in the verbose form ("P_MID_V_MID P_HIGH_V_LOW ...") costs ~6 BPE
+tokens per bar of prefill. The alternatives:
+
+    verbose     P_MID_V_MID P_MID_V_MID P_HIGH_V_LOW
+    rle         P_MID_V_MID*2 P_HIGH_V_LOW              runs of one token collapsed to T*n
+    short       Mm Mm Hl                                price letter + volume letter
+    short_rle   Mm*2 Hl
+
+Short codes need the legend from `legend()` in the prompt. Predictions are still
+full composite tokens (the forecast schema only allows those); `normalize_token`
+maps short codes back when decoding sequences.
+
+The fine-tuned model was trained on verbose sequences, so the encoding is chosen per
+model (MODEL_SEQUENCE_ENCODINGS) and should be validated with app.ml.evaluate_slm --encoding.
+"""
+import re
+from typing import Iterable, List
+
+from app.ml.vocabulary import P_TOKENS, V_TOKENS
+
+ENCODINGS = ("verbose", "rle", "short", "short_rle")
+
+# Upper-case price letter + lower-case volume letter: every code is exactly two characters
+P_CODES = {"P_SURGE": "S", "P_CRASH": "C", "P_HIGH": "H", "P_LOW": "L", "P_MID": "M"}
+V_CODES = {"V_SURGE": "s", "V_PEAK": "p", "V_HIGH": "h", "V_LOW": "l", "V_MID": "m"}
+
+TOKEN_TO_CODE = {f"{p}_{v}": P_CODES[p] + V_CODES[v] for p in P_TOKENS for v in V_TOKENS}
+CODE_TO_TOKEN = {code: token for token, code in TOKEN_TO_CODE.items()}
+
+_RUN = re.compile(r"^(?P<item>[A-Za-z_]+)\*(?P<count>\d+)$")
+
+
+def _check(encoding: str):
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown sequence encoding '{encoding}'. Expected one of {ENCODINGS}")
+
+
+def encode_sequence(tokens: Iterable[str], encoding: str = "verbose") -> str:
+    _check(encoding)
+    items = [TOKEN_TO_CODE.get(t, t) for t in tokens] if encoding.startswith("short") else list(tokens)
+    if not encoding.endswith("rle"):
+        return " ".join(items)
+
+    runs = []
+    for item in items:
+        if runs and runs[-1][0] == item:
+            runs[-1][1] += 1
+        else:
+            runs.append([item, 1])
+    return " ".join(item if n == 1 else f"{item}*{n}" for item, n in runs)
+
+
+def normalize_token(item: str) -> str:
+    """Full composite token for a verbose token or short code; anything else is returned upper-cased."""
+    if item in CODE_TO_TOKEN:
+        return CODE_TO_TOKEN[item]
+    return item.upper()
+
+
+def decode_sequence(text: str) -> List[str]:
+    """Inverse of encode_sequence for every encoding (the forms cannot be confused with each other)."""
+    tokens = []
+    for item in text.split():
+        match = _RUN.match(item)
+        count = 1
+        if match:
+            item, count = match.group("item"), int(match.group("count"))
+        tokens.extend([normalize_token(item)] * count)
+    return tokens
+
+
+def legend(encoding: str = "verbose") -> str:
+    """Prompt line explaining the encoding ("" when the verbose vocabulary line suffices)."""
+    _check(encoding)
+    lines = []
+    if encoding.startswith("short"):
+        price = " ".join(f"{code}={token[2:]}" for token, code in P_CODES.items())
+        volume = " ".join(f"{code}={token[2:]}" for token, code in V_CODES.items())
+        lines.append(
+            f"Codes: price letter then volume letter. Price: {price}. Volume: {volume}. "
+            f"Example: Hl = P_HIGH_V_LOW."
+        )
+    if encoding.endswith("rle"):
+        lines.append("X*n means X repeated n times in a row.")
+    return " ".join(lines)
+
+
+def encoding_for_model(model: str, overrides: dict, default: str = "verbose") -> str:
+    encoding = overrides.get(model, default)
+    _check(encoding)
+    return encoding
+
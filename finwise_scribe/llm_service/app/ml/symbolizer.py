@@ -1,7 +1,9 @@
 import pandas as pd
 import numpy as np
 import pandas_datareader.data as web
+import app.core.stooq  # noqa: F401  (applies the STOOQ_URL override)
 from datetime import datetime, timedelta
+from app.core.metrics import STOOQ_FETCH_SECONDS, STOOQ_FETCH_ERRORS
 
 class FinwiseSymbolizer:
     def __init__(self, tickers=None, period="2y"):
@@ -17,6 +19,8 @@ class FinwiseSymbolizer:
             return today - timedelta(days=2*365)
         elif self.period == "1y":
             return today - timedelta(days=365)
+        elif self.period.endswith("y") and self.period[:-1].isdigit():
+            return today - timedelta(days=int(self.period[:-1])*365)
         else:
             # Default to 1 year if unknown
             return today - timedelta(days=365)
@@ -29,13 +33,17 @@ class FinwiseSymbolizer:
         
         try:
             # Use pandas_datareader (Source: Stooq is reliable/free for equities)
-            data = web.DataReader(ticker, 'stooq', start=start_date)
+            with STOOQ_FETCH_SECONDS.time():
+                data = web.DataReader(ticker, 'stooq', start=start_date)
+            if data.empty:
+                STOOQ_FETCH_ERRORS.inc()
             
             # CRITICAL: Stooq returns data newest-first. We need oldest-first.
             data = data.sort_index(ascending=True)
             
             return data
         except Exception as e:
+            STOOQ_FETCH_ERRORS.inc()
             print(f"Error fetching data for {ticker}: {e}")
             return pd.DataFrame()
 
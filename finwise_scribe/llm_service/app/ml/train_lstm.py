@@ -3,98 +3,201 @@ import pandas as pd
 import joblib
 import os
 import sys
+import json
+import argparse
+from datetime import datetime
 
 # Add /app to python path
 sys.path.append("/app")
 
-from typing import List
+from typing import Dict, List, Optional
 from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
+from tensorflow.keras.models import Sequential, load_model
+from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import ModelCheckpoint
-from app.ml.symbolizer import FinwiseSymbolizer
+from tensorflow.keras.utils import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from app.ml.registry import ModelRegistry
+from app.ml.market_data import MarketDataCache, fetch_many, DEFAULT_CACHE_DIR
+from app.ml.windowing import compute_features, sliding_windows
+
+class WindowedSequence(Sequence):
+    """
+    Lazily yields (X, y) batches of sliding windows over a compact feature array.
+    Memory is one copy of the bars plus one index per window, independent of sequence length.
+    """
+    def __init__(self, data: np.ndarray, starts: np.ndarray, sequence_length: int,
+                 batch_size: int = 32, shuffle: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.data = data
+        self.starts = starts
+        self.sequence_length = sequence_length
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        # Strided view: windows[s] == data[s:s+L], no copy
+        self.windows = sliding_windows(data, sequence_length)
+        self.order = np.random.permutation(starts) if shuffle else starts
+
+    @property
+    def n_windows(self) -> int:
+        return len(self.starts)
+
+    def __len__(self):
+        return int(np.ceil(len(self.starts) / self.batch_size))
+
+    def __getitem__(self, index):
+        batch_starts = self.order[index * self.batch_size:(index + 1) * self.batch_size]
+        # X: Sequence of 60 days, y: The NEXT day's [Price_Change, Vol_Change]
+        X = self.windows[batch_starts]
+        y = self.data[batch_starts + self.sequence_length]
+        return X, y
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.order = np.random.permutation(self.starts)
+
+def _prepare_ticker(job):
+    """Process-pool worker: raw OHLCV -> [Price_Change, Volume_Change] array, or an error message."""
+    ticker, raw_data, min_length = job
+    try:
+        if raw_data.empty:
+            return ticker, None, None, f"Warning: No data for {ticker} (Check if Stooq supports it)"
+
+        # Ensure required columns exist
+        if 'Close' not in raw_data.columns or 'Volume' not in raw_data.columns:
+            return ticker, None, None, f"Missing columns for {ticker}. Found: {raw_data.columns}"
+
+        # Calculate features: [Price_Change, Volume_Change]
+        df = compute_features(raw_data)
+
+        if len(df) < min_length:
+            return ticker, None, None, f"Not enough data for {ticker}"
+
+        return ticker, df.values, df.index.values, None
+    except Exception as e:
+        return ticker, None, None, f"Failed to process {ticker}: {e}"
 
 class LSTMTrainer:
-    def __init__(self, tickers: List[str], sequence_length: int = 60):
+    def __init__(self, tickers: List[str], sequence_length: int = 60, period: str = "5y",
+                 fetch_workers: int = 8, requests_per_second: float = 4.0,
+                 processes: int = None, cache_dir: str = DEFAULT_CACHE_DIR,
+                 publish_role: Optional[str] = "current", model_dir: str = "/app/models"):
         self.tickers = tickers
         self.sequence_length = sequence_length
-        self.model_dir = "/app/models"
+        self.period = period
+        self.fetch_workers = fetch_workers
+        self.requests_per_second = requests_per_second
+        self.processes = processes if processes is not None else (os.cpu_count() or 1)
+        self.cache = MarketDataCache(cache_dir) if cache_dir else None
+        self.model_dir = model_dir
         self.model_path = os.path.join(self.model_dir, "lstm_baseline.h5")
         self.scaler_path = os.path.join(self.model_dir, "lstm_scaler.joblib")
+        # Training cutoff (last bar fitted per ticker), written next to the model
+        self.meta_path = os.path.join(self.model_dir, "lstm_baseline.meta.json")
+        self.scaler = None
+        self.feature_dates = {}
+        # Global row index of each ticker's first bar, and the target date of its last training window
+        self.ticker_offsets = {}
+        self.trained_through = {}
+        # After training, artifacts are published as a new registry version for this role
+        # ("current", "candidate" for A/B, or None to only write the flat files)
+        self.publish_role = publish_role
+        self.registry = ModelRegistry(self.model_dir)
         
         if not os.path.exists(self.model_dir):
             os.makedirs(self.model_dir)
 
-    def fetch_and_prepare_data(self):
+    def fetch_and_prepare_data(self, fit_scaler: bool = True):
+        """
+        Returns (data, ticker_starts): one scaled float32 array of all bars and, per ticker,
+        the global row indices where its windows start. Bar dates land in self.feature_dates.
+        With fit_scaler=False the already-loaded scaler is reused (incremental mode).
+        """
         print(f"Fetching data for {len(self.tickers)} tickers...")
-        
-        full_features = []
-
-        for ticker in self.tickers:
-            print(f"Processing {ticker}...")
-            try:
-                # Instantiate symbolizer for THIS ticker only
-                # This aligns with the Stooq fetcher in symbolizer.py
-                symbolizer = FinwiseSymbolizer(tickers=[ticker], period="5y")
-                raw_data = symbolizer.fetch_data()
-                
-                if raw_data.empty:
-                    print(f"Warning: No data for {ticker} (Check if Stooq supports it)")
-                    continue
-
-                # Ensure required columns exist
-                if 'Close' not in raw_data.columns or 'Volume' not in raw_data.columns:
-                    print(f"Missing columns for {ticker}. Found: {raw_data.columns}")
-                    continue
-
-                # Calculate features: [Price_Change, Volume_Change]
-                df = pd.DataFrame()
-                df['P_Change'] = raw_data['Close'].pct_change()
-                df['V_Change'] = raw_data['Volume'].pct_change()
-                df.replace([np.inf, -np.inf], np.nan, inplace=True)
-                df.dropna(inplace=True)
-                
-                if len(df) < self.sequence_length + 10:
-                    print(f"Not enough data for {ticker}")
-                    continue
-
-                full_features.append(df.values)
-                
-            except Exception as e:
-                print(f"Failed to fetch/process {ticker}: {e}")
+
+        # 1. Network-bound: concurrent, rate-limited, disk-cached
+        raw = fetch_many(
+            self.tickers, period=self.period, max_workers=self.fetch_workers,
+            requests_per_second=self.requests_per_second, cache=self.cache
+        )
+
+        # 2. CPU-bound: feature computation across a process pool
+        jobs = [(ticker, raw[ticker], self.sequence_length + 10) for ticker in self.tickers]
+        if self.processes > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=self.processes) as pool:
+                prepared = list(pool.map(_prepare_ticker, jobs, chunksize=max(1, len(jobs) // (self.processes * 4))))
+        else:
+            prepared = [_prepare_ticker(job) for job in jobs]
+
+        full_features = {}
+        self.feature_dates = {}
+        for ticker, values, dates, error in prepared:
+            if error:
+                print(error)
                 continue
+            full_features[ticker] = values
+            self.feature_dates[ticker] = dates
 
         if not full_features:
             raise ValueError("No valid data collected for ANY ticker. Check internet/proxy.")
 
         # Stack all data vertically to fit the scaler
-        combined_data = np.vstack(full_features)
+        combined_data = np.vstack(list(full_features.values()))
         
-        print("Fitting scaler on generalized market data...")
-        self.scaler = MinMaxScaler(feature_range=(0, 1))
-        self.scaler.fit(combined_data)
-        joblib.dump(self.scaler, self.scaler_path)
-
-        all_X, all_y = [], []
-        print("Creating sequences...")
-        for ticker_data in full_features:
-            scaled_data = self.scaler.transform(ticker_data)
-            
-            for i in range(self.sequence_length, len(scaled_data)):
-                # X: Sequence of 60 days
-                all_X.append(scaled_data[i-self.sequence_length:i, :])
-                # y: The NEXT day's [Price_Change, Vol_Change]
-                all_y.append(scaled_data[i, :]) 
-
-        return np.array(all_X), np.array(all_y)
+        if fit_scaler:
+            print("Fitting scaler on generalized market data...")
+            self.scaler = MinMaxScaler(feature_range=(0, 1))
+            self.scaler.fit(combined_data)
+            joblib.dump(self.scaler, self.scaler_path)
+
+        # Keep ONE compact scaled copy of the bars. Windows are generated per batch
+        # by WindowedSequence instead of materializing every 60-step window up front.
+        print("Indexing sequences...")
+        data = self.scaler.transform(combined_data).astype(np.float32)
+
+        ticker_starts = {}
+        self.ticker_offsets = {}
+        offset = 0
+        for ticker, ticker_data in full_features.items():
+            self.ticker_offsets[ticker] = offset
+            # Window [s, s+L) predicts row s+L, which must stay inside the same ticker
+            n_windows = len(ticker_data) - self.sequence_length
+            ticker_starts[ticker] = np.arange(offset, offset + n_windows, dtype=np.int64)
+            offset += len(ticker_data)
+
+        return data, ticker_starts
+
+    def build_sequences(self, data: np.ndarray, ticker_starts: Dict[str, np.ndarray],
+                        batch_size: int = 32, validation_split: float = 0.1):
+        """
+        Holds out the most recent `validation_split` of every ticker's windows. The held-out
+        bars are not fitted, so self.trained_through stops at the last training window's target
+        and the next incremental run picks them up.
+        """
+        train_idx, val_idx = [], []
+        self.trained_through = {}
+        for ticker, starts in ticker_starts.items():
+            n_val = int(len(starts) * validation_split)
+            cut = len(starts) - n_val
+            train_idx.append(starts[:cut])
+            val_idx.append(starts[cut:])
+            if cut:
+                target = starts[cut - 1] - self.ticker_offsets[ticker] + self.sequence_length
+                self.trained_through[ticker] = self.feature_dates[ticker][target]
+
+        train_seq = WindowedSequence(data, np.concatenate(train_idx), self.sequence_length, batch_size, shuffle=True)
+        val_seq = WindowedSequence(data, np.concatenate(val_idx), self.sequence_length, batch_size, shuffle=False)
+        return train_seq, val_seq
 
     def train(self, epochs=10, batch_size=32):
-        X, y = self.fetch_and_prepare_data()
+        data, ticker_starts = self.fetch_and_prepare_data()
+        train_seq, val_seq = self.build_sequences(data, ticker_starts, batch_size)
         
-        print(f"Building Dual-Output Model. Input: {X.shape}, Output: {y.shape}...")
+        print(f"Building Dual-Output Model. Bars: {data.shape}, Windows: {train_seq.n_windows} train / {val_seq.n_windows} val...")
         
         model = Sequential()
-        model.add(LSTM(64, return_sequences=True, input_shape=(X.shape[1], 2)))
+        model.add(LSTM(64, return_sequences=True, input_shape=(self.sequence_length, 2)))
         model.add(Dropout(0.2))
         model.add(LSTM(32, return_sequences=False))
         model.add(Dropout(0.2))
@@ -105,20 +208,116 @@ class LSTMTrainer:
         
         print("Starting training...")
         model.fit(
-            X, y,
-            batch_size=batch_size,
+            train_seq,
             epochs=epochs,
-            validation_split=0.1,
+            validation_data=val_seq,
             callbacks=[
                 ModelCheckpoint(self.model_path, save_best_only=True, monitor='val_loss')
             ]
         )
+        self._save_metadata(mode="full")
         print(f"Training Complete. Model saved to {self.model_path}")
+        self._publish()
+
+    def train_incremental(self, epochs=3, batch_size=32, learning_rate=1e-4):
+        """
+        Warm-start: loads the current model and scaler and fine-tunes only on windows whose
+        target bar is newer than the recorded cutoff. Falls back to a full train when no
+        previous artifact (or cutoff) exists.
+        """
+        meta = self._load_metadata()
+        if meta is None or not os.path.exists(self.model_path) or not os.path.exists(self.scaler_path):
+            print(f"No previous model/cutoff found. Running full training ({epochs} epochs) instead.")
+            return self.train(epochs=epochs, batch_size=batch_size)
+
+        self.scaler = joblib.load(self.scaler_path)
+        data, ticker_starts = self.fetch_and_prepare_data(fit_scaler=False)
+
+        cutoffs = meta.get("cutoffs", {})
+        new_starts = {}
+        for ticker, starts in ticker_starts.items():
+            target_dates = self.feature_dates[ticker][self.sequence_length:]
+            if ticker in cutoffs:
+                # Keep windows predicting a bar after the cutoff; their 60-bar context may overlap old data
+                mask = target_dates > np.datetime64(cutoffs[ticker])
+                starts = starts[mask]
+            if len(starts):
+                new_starts[ticker] = starts
+
+        n_new = sum(len(s) for s in new_starts.values())
+        if n_new == 0:
+            print(f"No bars newer than the last cutoff ({meta.get('cutoff')}). Model is up to date.")
+            return
+
+        # Too few windows for a meaningful holdout: fine-tune on all of them and save at the end
+        use_validation = n_new >= 10 * len(new_starts)
+        train_seq, val_seq = self.build_sequences(
+            data, new_starts, batch_size, validation_split=0.1 if use_validation else 0.0
+        )
+        print(f"Fine-tuning on {n_new} new windows from {len(new_starts)} tickers (cutoff {meta.get('cutoff')})...")
+
+        model = load_model(self.model_path, compile=False)
+        model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse')
+
+        if use_validation:
+            model.fit(
+                train_seq, epochs=epochs, validation_data=val_seq,
+                callbacks=[ModelCheckpoint(self.model_path, save_best_only=True, monitor='val_loss')]
+            )
+        else:
+            model.fit(train_seq, epochs=epochs)
+            model.save(self.model_path)
+
+        self._save_metadata(mode="incremental", previous=meta)
+        print(f"Incremental Training Complete. Model saved to {self.model_path}")
+        self._publish()
+
+    def _publish(self):
+        if not self.publish_role:
+            return
+        version = self.registry.publish(
+            self.model_path, self.scaler_path, self.meta_path, role=self.publish_role
+        )
+        print(f"Published model version '{version}' as {self.publish_role}.")
+
+    def _load_metadata(self):
+        if not os.path.exists(self.meta_path):
+            return None
+        with open(self.meta_path) as f:
+            return json.load(f)
+
+    def _save_metadata(self, mode: str, previous: dict = None):
+        cutoffs = dict(previous.get("cutoffs", {})) if previous else {}
+        for ticker, date in self.trained_through.items():
+            cutoffs[ticker] = str(np.datetime_as_string(date, unit="D"))
+
+        meta = {
+            "trained_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "mode": mode,
+            "sequence_length": self.sequence_length,
+            "cutoff": max(cutoffs.values()),
+            "cutoffs": cutoffs,
+        }
+        with open(self.meta_path, "w") as f:
+            json.dump(meta, f, indent=2)
 
 if __name__ == "__main__":
     # Note: Stooq often works better with .US suffix for US stocks, 
     # but try standard tickers first.
     TICKERS = ["MSFT.US", "AAPL.US", "GOOGL.US", "AMZN.US", "NVDA.US", "TSLA.US", "JPM.US"]
-    
-    trainer = LSTMTrainer(TICKERS)
-    trainer.train(epochs=10)
\ No newline at end of file
+
+    parser = argparse.ArgumentParser(description="Train the LSTM baseline.")
+    parser.add_argument("--tickers", nargs="+", default=TICKERS)
+    parser.add_argument("--epochs", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Fine-tune the existing model on bars added since the last cutoff")
+    parser.add_argument("--publish", choices=["current", "candidate", "none"], default="current",
+                        help="Registry role for the new version (running engines hot-reload it)")
+    args = parser.parse_args()
+
+    trainer = LSTMTrainer(args.tickers, publish_role=None if args.publish == "none" else args.publish)
+    if args.incremental:
+        trainer.train_incremental(epochs=args.epochs or 3, batch_size=args.batch_size)
+    else:
+        trainer.train(epochs=args.epochs or 10, batch_size=args.batch_size)
\ No newline at end of file
@@ -0,0 +1,35 @@
+import numpy as np
+
+# Composite token vocabulary: P_[ACTION]_V_[VOLATILITY].
+# Thresholds must match FinwiseSymbolizer.process and LSTMEngine._get_token_from_values.
+P_TOKENS = ["P_SURGE", "P_CRASH", "P_HIGH", "P_LOW", "P_MID"]
+V_TOKENS = ["V_SURGE", "V_PEAK", "V_HIGH", "V_LOW", "V_MID"]
+COMPOSITE_TOKENS = [f"{p}_{v}" for p in P_TOKENS for v in V_TOKENS]
+TOKEN_INDEX = {token: i for i, token in enumerate(COMPOSITE_TOKENS)}
+
+# Ordinal level of each token (same order as above), used for token-level error metrics
+P_LEVELS = np.array([2, -2, 1, -1, 0], dtype=np.float64)
+V_LEVELS = np.array([3, 2, 1, -1, 0], dtype=np.float64)
+
+
+def price_token_ids(p_change: np.ndarray) -> np.ndarray:
+    """Vectorized price tokenizer. Returns indices into P_TOKENS."""
+    p = np.asarray(p_change)
+    conditions = [p >= 0.03, p <= -0.03, p >= 0.01, p <= -0.01]
+    return np.select(conditions, [0, 1, 2, 3], default=4)
+
+
+def volume_token_ids(v_change: np.ndarray) -> np.ndarray:
+    """Vectorized volume tokenizer. Returns indices into V_TOKENS."""
+    v = np.asarray(v_change)
+    conditions = [v >= 0.20, v >= 0.10, v >= 0.05, v <= -0.05]
+    return np.select(conditions, [0, 1, 2, 3], default=4)
+
+
+def composite_token_ids(p_change: np.ndarray, v_change: np.ndarray) -> np.ndarray:
+    """Vectorized composite tokenizer. Returns indices into COMPOSITE_TOKENS."""
+    return price_token_ids(p_change) * len(V_TOKENS) + volume_token_ids(v_change)
+
+
+def ids_to_tokens(ids: np.ndarray) -> np.ndarray:
+    return np.asarray(COMPOSITE_TOKENS)[ids]
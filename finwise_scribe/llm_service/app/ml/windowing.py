@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def compute_features(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    LSTM input features: [Price_Change, Volume_Change].
+    Shared by training, live inference and backtesting so all three see identical inputs.
+    """
+    df = pd.DataFrame(index=raw_data.index)
+    df['P_Change'] = raw_data['Close'].pct_change()
+    df['V_Change'] = raw_data['Volume'].pct_change()
+    df.replace([np.inf, -np.inf], np.nan, inplace=True)
+    df.dropna(inplace=True)
+    return df
+
+
+def sliding_windows(values: np.ndarray, sequence_length: int) -> np.ndarray:
+    """
+    All contiguous windows of `sequence_length` rows as a read-only strided view.
+    Shape: (n_rows - sequence_length + 1, sequence_length, n_features). No data is copied.
+    """
+    return sliding_window_view(values, sequence_length, axis=0).transpose(0, 2, 1)
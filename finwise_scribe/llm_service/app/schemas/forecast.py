@@ -0,0 +1,31 @@
+# app/schemas/forecast.py
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from app.ml.vocabulary import COMPOSITE_TOKENS
+
+# Fallback when the LLM produced nothing usable; a real vocabulary token (neutral price, neutral volume)
+FALLBACK_TOKEN = "P_MID_V_MID"
+
+class LLMForecast(BaseModel):
+    """
+    Structured output of a forecast/validation generation.
+    Its JSON schema is sent to Ollama as `format`, so decoding is grammar-constrained to
+    exactly these fields: `prediction` can only be one of the 25 composite tokens.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    prediction: Literal[tuple(COMPOSITE_TOKENS)]
+    confidence: int = Field(ge=0, le=100)
+    reasoning: str = Field(max_length=160)
+
+# Sent as Ollama's `format`; the docstring is for readers, not the grammar
+FORECAST_SCHEMA = {k: v for k, v in LLMForecast.model_json_schema().items() if k != "description"}
+
+def parse_forecast(raw: str) -> Optional[LLMForecast]:
+    """Strict parse of a generation. None if it is not exactly an LLMForecast (e.g. truncated by num_predict)."""
+    try:
+        return LLMForecast.model_validate_json(raw)
+    except ValidationError:
+        return None
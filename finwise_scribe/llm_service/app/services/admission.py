@@ -0,0 +1,39 @@
+from typing import Awaitable, Callable
+
+from app.core.metrics import IN_FLIGHT_REQUESTS, REJECTED_REQUESTS
+
+
+class InFlightLimiter:
+    """
+    Caps concurrent /predict and /chat calls, and deferred shadow validation. Each one can hold
+    an Ollama generation for minutes, so beyond the cap callers are told to come back (429)
+    instead of queueing here, and background work is skipped.
+    Requests run on a single event loop, so a plain counter is enough.
+    """
+    def __init__(self, max_in_flight: int, retry_after_seconds: int = 5):
+        self.max_in_flight = max_in_flight
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+
+    def try_acquire(self, endpoint: str) -> bool:
+        # 0 = unlimited
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            REJECTED_REQUESTS.labels(endpoint).inc()
+            return False
+        self.in_flight += 1
+        IN_FLIGHT_REQUESTS.set(self.in_flight)
+        return True
+
+    def release(self):
+        self.in_flight = max(self.in_flight - 1, 0)
+        IN_FLIGHT_REQUESTS.set(self.in_flight)
+
+    async def run_if_free(self, endpoint: str, func: Callable[..., Awaitable], *args, **kwargs):
+        """Runs background work in its own slot (it starts after the request's slot is released); skipped at the cap."""
+        if not self.try_acquire(endpoint):
+            print(f"Skipping {endpoint}: {self.in_flight} calls already in flight")
+            return None
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self.release()
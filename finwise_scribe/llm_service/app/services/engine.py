@@ -17,12 +17,28 @@ import json
 import re
 import pandas as pd
 from app.core.config import settings
+from app.core.metrics import OLLAMA_ERRORS, OLLAMA_INVALID_OUTPUT, observe_ollama
+from app.core.profiling import phase
 from app.ml.symbolizer import FinwiseSymbolizer
 from app.ml.lstm_engine import LSTMEngine
+from app.ml.sequence_encoding import encoding_for_model
+from app.services.prompts import PromptBuilder
+from app.schemas.forecast import FALLBACK_TOKEN, FORECAST_SCHEMA, LLMForecast, parse_forecast
+from app.services.llm_backends import LLMBackendError, build_router
+from app.services.shadow import ShadowSampler, LLMBudget
+from typing import Callable, Optional
 
 class ScribeEngine:
     def __init__(self):
         self.lstm = LSTMEngine()
+        self.shadow_sampler = ShadowSampler(settings.SHADOW_VALIDATION_MODE, settings.SHADOW_SAMPLE_RATE)
+        self.shadow_budget = LLMBudget(settings.SHADOW_LLM_BUDGET_PER_MINUTE)
+        self.encoding = encoding_for_model(
+            settings.MODEL_NAME, settings.MODEL_SEQUENCE_ENCODINGS, settings.SEQUENCE_ENCODING
+        )
+        self.prompts = PromptBuilder(self.encoding, settings.PROMPT_WINDOW_ALIGN)
+        # Ordered failover across LLM_BACKENDS (Ollama by default)
+        self.llm = build_router()
         mlflow_uri = os.getenv("MLFLOW_TRACKING_URI", "http://mlflow:5000")
         mlflow.set_tracking_uri(mlflow_uri)
         try:
@@ -30,100 +46,149 @@ class ScribeEngine:
         except:
             pass
 
-    async def _run_llm(self, prompt: str):
-        """Helper to call Ollama and handle basic errors."""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{settings.OLLAMA_URL}/api/generate",
-                    json={
-                        "model": "finwise_scribe_v1", 
-                        "prompt": prompt,
-                        "stream": False,
-                        "format": "json", 
-                        "options": {
-                            "temperature": 0.1, # Keep low for JSON syntax
-                            "stop": ["\n", "User:", "```"]
-                        }
-                    },
-                    timeout=300.0
-                )
-                if response.status_code == 200:
-                    return response.json().get("response", "{}")
-            except Exception as e:
-                print(f"LLM Error: {e}")
-        return "{}"
-
-    async def predict(self, symbol: str):
+    async def _run_llm(self, prompt: str, purpose: str = "forecast") -> Optional[LLMForecast]:
+        """
+        Schema-constrained forecast generation: the backend's grammar only allows an
+        LLMForecast object, and LLM_NUM_PREDICT caps the length. None on errors or invalid output.
+        """
+        try:
+            started = time.perf_counter()
+            body = await self.llm.generate(
+                prompt, schema=FORECAST_SCHEMA, temperature=0.1, max_tokens=settings.LLM_NUM_PREDICT
+            )
+        except LLMBackendError as e:
+            OLLAMA_ERRORS.labels(purpose).inc()
+            print(f"LLM Error: {e}")
+            return None
+        observe_ollama(purpose, time.perf_counter() - started, body)
+        forecast = parse_forecast(body.get("response", ""))
+        if forecast is None:
+            OLLAMA_INVALID_OUTPUT.labels(purpose).inc()
+        return forecast
+
+    async def predict(self, symbol: str, schedule: Optional[Callable] = None):
+        """
+        Returns the forecast. The rolling validation backtest is shadow-mode telemetry,
+        so it is sampled and, when a `schedule` hook is given (e.g. FastAPI's
+        BackgroundTasks.add_task), deferred until after the response is sent.
+        """
         start_time = time.time()
         
         # 1. Fetch Data
         try:
             symbolizer = FinwiseSymbolizer(tickers=[symbol], period="1y")
-            raw_df = symbolizer.fetch_data()
+            with phase("fetch", {"symbol": symbol}):
+                raw_df = symbolizer.fetch_data()
             if raw_df.empty: return {"error": "No Data"}
-            _, _, full_tokens = symbolizer.process(raw_df)
+            with phase("process"):
+                _, _, full_tokens = symbolizer.process(raw_df)
         except Exception as e:
             return {"error": f"Data Error: {e}"}
 
+        bar_date = raw_df.index[-1].strftime("%Y-%m-%d")
+
         # ==========================================
-        # PHASE A: ROLLING VALIDATION
+        # PHASE A: FORECAST (Future)
+        # ==========================================
+        with phase("lstm_forecast") as span:
+            lstm_future = self.lstm.predict(symbol, data_override=raw_df)
+            span.set_attribute("model_version", str(lstm_future.get("model_version")))
+        future_prompt = self.prompts.forecast(full_tokens, symbol)
+        
+        with phase("llm_forecast"):
+            forecast = await self._run_llm(future_prompt)
+        if forecast is None:
+            forecast = LLMForecast(prediction=FALLBACK_TOKEN, confidence=0, reasoning="LLM forecast unavailable.")
+        parsed_result = forecast.model_dump()
+
+        # The schema bounds confidence to 0-100
+        final_conf = forecast.confidence / 100.0
+
         # ==========================================
-        VALIDATION_WINDOW = 3
+        # PHASE B: SHADOW VALIDATION (Sampled + Deferred)
+        # ==========================================
+        validation_status = "skipped"
+        if self.shadow_sampler.should_validate(symbol, bar_date):
+            if schedule is not None:
+                schedule(self.run_shadow_validation, symbol, raw_df, full_tokens)
+                validation_status = "deferred"
+            else:
+                await self.run_shadow_validation(symbol, raw_df, full_tokens)
+                validation_status = "completed"
+
+        # ==========================================
+        # PHASE C: LOGGING
+        # ==========================================
+        try:
+            with phase("mlflow_log"), mlflow.start_run():
+                mlflow.log_param("symbol", symbol)
+                mlflow.log_param("bar_date", bar_date)
+                mlflow.log_param("shadow_validation", validation_status)
+                
+                mlflow.log_param("forecast_lstm", lstm_future.get("prediction_token"))
+                mlflow.log_param("forecast_llm", parsed_result.get("prediction"))
+                mlflow.log_metric("llm_confidence", final_conf)
+                
+                mlflow.log_text(json.dumps(parsed_result), "output.json")
+                mlflow.log_metric("inference_latency", time.time() - start_time)
+        except Exception as e:
+            print(f"MLflow Log Error: {e}")
+
+        return {
+            "symbol": symbol,
+            "prediction": forecast.prediction,
+            "confidence": final_conf,
+            "reasoning": forecast.reasoning,
+            "shadow_baseline": lstm_future,
+            "bar_date": bar_date,
+            "shadow_validation": validation_status,
+            "history_used": f"60 Days (Shadow Validation: {validation_status})"
+        }
+
+    async def run_shadow_validation(self, symbol: str, raw_df: pd.DataFrame, full_tokens: pd.Series):
+        """
+        Rolling backtest over the last SHADOW_VALIDATION_WINDOW bars.
+        LSTM backtests always run (cheap); LLM backtests draw from the per-minute budget.
+        """
+        with phase("shadow_validation", {"symbol": symbol}):
+            return await self._shadow_validation(symbol, raw_df, full_tokens)
+
+    async def _shadow_validation(self, symbol: str, raw_df: pd.DataFrame, full_tokens: pd.Series):
+        start_time = time.time()
+        window = settings.SHADOW_VALIDATION_WINDOW
         lstm_hits = 0
         llm_hits = 0
+        llm_scored = 0
         validation_logs = []
 
-        for i in range(1, VALIDATION_WINDOW + 1):
+        for i in range(1, window + 1):
             target_idx = -i
             target_token = full_tokens.iloc[target_idx]
             cutoff_df = raw_df.iloc[:target_idx]
             
             # LSTM Backtest
-            lstm_val = self.lstm.predict(symbol, data_override=cutoff_df)
+            with phase("lstm_backtest", {"day_offset": i}):
+                lstm_val = self.lstm.predict(symbol, data_override=cutoff_df)
             lstm_pred = lstm_val.get("prediction_token", "N/A")
             
             if lstm_pred == target_token:
                 lstm_hits += 1
                 
-            # LLM Backtest
-            start_idx = target_idx - 60
-            if target_idx == -1:
-                hist_tokens = full_tokens.iloc[start_idx:-1]
+            # LLM Backtest (skipped once the shadow budget is spent)
+            if not self.shadow_budget.try_acquire():
+                llm_pred = "SKIPPED"
             else:
-                hist_tokens = full_tokens.iloc[start_idx:target_idx]
+                # Same prompt as the forecast on the history before the target bar, so the
+                # system prefix (and, with aligned windows, most of the sequence) is already cached
+                val_prompt = self.prompts.forecast(full_tokens.iloc[:target_idx], symbol)
                 
-            history_str = " ".join(hist_tokens.values)
-            
-            # IMPROVED PROMPT: Removes ambiguity
-            val_prompt = (
-                f"You are validating a financial model.\n"
-                f"Token Vocabulary: P_[ACTION]_V_[VOLATILITY]\n"
-                f"Sequence: [{history_str}]\n"
-                f"Task: Predict the NEXT composite token.\n"
-                f"Output: Valid JSON only. Do not use placeholders.\n"
-                f"Example: {{ \"prediction\": \"P_SURGE_V_HIGH\" }}" 
-            )
-            
-            llm_resp = await self._run_llm(val_prompt)
-            
-            # ROBUST PARSING
-            try:
-                # Strip markdown if present
-                clean_resp = llm_resp.replace("```json", "").replace("```", "").strip()
-                llm_json = json.loads(clean_resp)
-                llm_pred = llm_json.get("prediction", "N/A").upper()
+                with phase("llm_validation", {"day_offset": i}):
+                    llm_forecast = await self._run_llm(val_prompt, purpose="validation")
+                llm_pred = llm_forecast.prediction if llm_forecast is not None else "ERROR"
                 
-                # Check if model lazily copied the example
-                if llm_pred == "P_SURGE_V_HIGH":
-                    # Fallback check: Did the model really think it was surge?
-                    # If not, try to extract first token from string
-                    pass 
-            except:
-                llm_pred = "ERROR"
-            
-            if llm_pred == target_token:
-                llm_hits += 1
+                llm_scored += 1
+                if llm_pred == target_token:
+                    llm_hits += 1
             
             validation_logs.append({
                 "day_offset": i,
@@ -134,103 +199,50 @@ class ScribeEngine:
                 "match_llm": (llm_pred == target_token)
             })
 
-        acc_lstm = lstm_hits / VALIDATION_WINDOW
-        acc_llm = llm_hits / VALIDATION_WINDOW
+        acc_lstm = lstm_hits / window
+        acc_llm = llm_hits / llm_scored if llm_scored else None
 
-        # ==========================================
-        # PHASE B: FORECAST (Future)
-        # ==========================================
-        lstm_future = self.lstm.predict(symbol, data_override=raw_df)
-        future_history = " ".join(full_tokens.tail(60).values)
-        
-        future_prompt = (
-            f"You are Finwise Scribe. Analyze the last 60 days for {symbol}.\n"
-            f"Token Vocabulary: P_[ACTION]_V_[VOLATILITY]\n"
-            f"Data: [{future_history}]\n\n"
-            f"Task: Predict the single most likely NEXT composite token.\n"
-            f"Output Requirement: JSON Only. Calculate specific confidence.\n"
-            f"Example: {{ \"prediction\": \"P_MID_V_LOW\", \"confidence\": 72, \"reasoning\": \"Trend is flattening...\" }}"
-        )
-        
-        llm_future_resp = await self._run_llm(future_prompt)
-        parsed_result = {"prediction": "P_STABLE_V_MID", "confidence": 50, "reasoning": "Processing..."}
         try:
-            clean_future = llm_future_resp.replace("```json", "").replace("```", "").strip()
-            parsed_result = json.loads(clean_future)
-        except:
-            pass
-
-        # Normalize Confidence
-        raw_conf = parsed_result.get("confidence", 50)
-        final_conf = raw_conf / 100.0 if raw_conf > 1.0 else raw_conf
-
-        # ==========================================
-        # PHASE C: LOGGING
-        # ==========================================
-        try:
-            with mlflow.start_run():
+            with phase("mlflow_log"), mlflow.start_run():
                 mlflow.log_param("symbol", symbol)
+                mlflow.log_param("bar_date", raw_df.index[-1].strftime("%Y-%m-%d"))
+                mlflow.log_param("phase", "shadow_validation")
                 mlflow.log_metric("val_accuracy_lstm", acc_lstm)
-                mlflow.log_metric("val_accuracy_llm", acc_llm)
-                
-                mlflow.log_param("forecast_lstm", lstm_future.get("prediction_token"))
-                mlflow.log_param("forecast_llm", parsed_result.get("prediction"))
-                mlflow.log_metric("llm_confidence", final_conf)
+                if acc_llm is not None:
+                    mlflow.log_metric("val_accuracy_llm", acc_llm)
+                mlflow.log_metric("val_llm_scored", llm_scored)
                 
                 mlflow.log_dict(validation_logs, "validation_details.json")
-                mlflow.log_text(json.dumps(parsed_result), "output.json")
-                mlflow.log_metric("inference_latency", time.time() - start_time)
+                mlflow.log_metric("validation_latency", time.time() - start_time)
         except Exception as e:
             print(f"MLflow Log Error: {e}")
 
-        return {
-            "symbol": symbol,
-            "prediction": parsed_result.get("prediction", "P_STABLE_V_MID"),
-            "confidence": final_conf,
-            "reasoning": parsed_result.get("reasoning", ""),
-            "shadow_baseline": lstm_future,
-            "history_used": f"60 Days (+ {VALIDATION_WINDOW} Day Validation)"
-        }
+        return validation_logs
 
     async def chat(self, message: str, symbol: str):
-        context_str = ""
+        tokens = None
+        bar_date = None
         try:
             symbolizer = FinwiseSymbolizer(tickers=[symbol])
-            raw_df = symbolizer.fetch_data()
+            with phase("fetch", {"symbol": symbol}):
+                raw_df = symbolizer.fetch_data()
             if not raw_df.empty:
-                _, _, tokens = symbolizer.process(raw_df)
-                history = " ".join(tokens.tail(30).values)
-                context_str = f"Last 30 Days of {symbol}: [{history}]"
+                bar_date = raw_df.index[-1].strftime("%Y-%m-%d")
+                with phase("process"):
+                    _, _, tokens = symbolizer.process(raw_df)
         except Exception:
-            context_str = "Market data unavailable."
-
-        prompt = (
-            f"### SYSTEM ROLE\n"
-            f"You are Scribe, a Technical Analysis AI. You ONLY analyze price action patterns.\n"
-            f"Token Structure: P_[ACTION]_V_[VOLATILITY]\n"
-            f"### MARKET DATA (Last 30 Days)\n"
-            f"Sequence: {context_str}\n\n"
-            f"### USER QUESTION\n"
-            f"{message}\n\n"
-            f"### RESPONSE\n"
-            f"(Answer based ONLY on the token sequence above. Be concise.)"
-        )
+            tokens = None
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{settings.OLLAMA_URL}/api/generate",
-                    json={
-                        "model": "finwise_scribe_v1", 
-                        "prompt": prompt, 
-                        "stream": False,
-                        "options": {"temperature": 0.7}
-                    },
-                    timeout=300.0
-                )
-                if response.status_code != 200:
-                    return {"response": "I'm having trouble thinking right now."}
-                result = response.json()
-                return {"response": result.get("response", "")}
-            except Exception as e:
-                return {"error": f"Chat inference failed: {str(e)}"}
\ No newline at end of file
+        prompt = self.prompts.chat(tokens, symbol, message)
+
+        try:
+            started = time.perf_counter()
+            with phase("llm_chat"):
+                result = await self.llm.generate(prompt, temperature=0.7)
+        except LLMBackendError as e:
+            OLLAMA_ERRORS.labels("chat").inc()
+            print(f"LLM Error: {e}")
+            return {"response": "I'm having trouble thinking right now."}
+        observe_ollama("chat", time.perf_counter() - started, result)
+        # bar_date lets callers cache the answer until the next bar arrives
+        return {"response": result.get("response", ""), "bar_date": bar_date}
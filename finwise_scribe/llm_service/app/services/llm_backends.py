@@ -0,0 +1,309 @@
+"""
+Pluggable LLM backends for the Scribe engine.
+
+Every backend takes a prompt and returns an Ollama-shaped body ({"response", "prompt_eval_count",
+"eval_count", "eval_duration", ...}) so metrics and parsing do not care who generated it:
+
+    ollama      Ollama HTTP API (/api/generate), the GPU default
+    openai      any OpenAI-compatible server (vLLM, llama-server, TGI) via /v1/completions
+    llamacpp    in-process llama.cpp on the CPU, loading the GGUF and settings from models/Modelfile
+    fake        deterministic persistence model from app.fakes.ollama (tests, load tests)
+
+LLMRouter tries the backends listed in LLM_BACKENDS in order. A backend that fails
+LLM_FAILURE_THRESHOLD times in a row is skipped for LLM_COOLDOWN_SECONDS, so a CPU-only node
+(LLM_BACKENDS=ollama,llamacpp with no reachable Ollama) serves at degraded speed instead of failing.
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import LLM_BACKEND_REQUESTS
+
+
+class LLMBackendError(Exception):
+    """Generation failed on a backend (or on every backend, when raised by the router)."""
+
+
+class LLMBackend(ABC):
+    name: str = "base"
+
+    @abstractmethod
+    async def generate(self, prompt: str, schema: Optional[Dict] = None, temperature: float = 0.1,
+                       max_tokens: Optional[int] = None) -> Dict:
+        """
+        Completion for a raw prompt. With a JSON schema, output is constrained to it.
+        Raises LLMBackendError when the backend cannot answer.
+        """
+
+
+class OllamaBackend(LLMBackend):
+    name = "ollama"
+
+    def __init__(self, url: str, model: str, keep_alive: str = "24h", timeout: float = 300.0):
+        self.url = url.rstrip("/")
+        self.model = model
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+
+    async def generate(self, prompt, schema=None, temperature=0.1, max_tokens=None):
+        options = {"temperature": temperature}
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": options,
+        }
+        if schema is not None:
+            payload["format"] = schema
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(f"{self.url}/api/generate", json=payload, timeout=self.timeout)
+        except httpx.HTTPError as e:
+            raise LLMBackendError(f"ollama: {e!r}") from e
+        if response.status_code != 200:
+            raise LLMBackendError(f"ollama: HTTP {response.status_code}")
+        try:
+            body = response.json()
+            if not isinstance(body["response"], str):
+                raise TypeError("response is not a string")
+        except (ValueError, KeyError, TypeError) as e:
+            raise LLMBackendError(f"{self.name}: malformed response") from e
+        return body
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    name = "openai"
+
+    def __init__(self, url: str, model: str, api_key: str = "", timeout: float = 300.0):
+        self.url = url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+
+    async def generate(self, prompt, schema=None, temperature=0.1, max_tokens=None):
+        payload = {"model": self.model, "prompt": prompt, "temperature": temperature}
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        if schema is not None:
+            payload["response_format"] = {
+                "type": "json_schema", "json_schema": {"name": "forecast", "schema": schema, "strict": True},
+            }
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        started = time.perf_counter()
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    f"{self.url}/v1/completions", json=payload, headers=headers, timeout=self.timeout
+                )
+        except httpx.HTTPError as e:
+            raise LLMBackendError(f"openai: {e!r}") from e
+        if response.status_code != 200:
+            raise LLMBackendError(f"openai: HTTP {response.status_code}")
+
+        try:
+            body = response.json()
+            usage = body.get("usage") or {}
+            text = body["choices"][0]["text"]
+            if not isinstance(text, str):
+                raise TypeError("text is not a string")
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            raise LLMBackendError(f"{self.name}: malformed response") from e
+        return {
+            "model": body.get("model", self.model),
+            "response": text,
+            "done": True,
+            "prompt_eval_count": usage.get("prompt_tokens", 0),
+            "eval_count": usage.get("completion_tokens", 0),
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+        }
+
+
+def read_modelfile(path: str) -> Dict:
+    """SYSTEM text and PARAMETER lines of an Ollama Modelfile (repeated parameters, e.g. stop, become lists)."""
+    with open(path) as f:
+        text = f.read()
+    system = re.search(r'^SYSTEM\s+"""(.*?)"""', text, re.MULTILINE | re.DOTALL)
+    parameters: Dict[str, object] = {}
+    for name, value in re.findall(r"^PARAMETER\s+(\S+)\s+(.+?)\s*$", text, re.MULTILINE):
+        value = value.strip().strip('"')
+        if name == "stop":
+            parameters.setdefault("stop", []).append(value)
+        else:
+            parameters[name] = float(value) if re.fullmatch(r"-?\d+(\.\d+)?", value) else value
+    return {"system": system.group(1).strip() if system else "", "parameters": parameters}
+
+
+class LlamaCppBackend(LLMBackend):
+    """
+    In-process CPU inference with llama-cpp-python (optional; see the INSTALL_LLAMA_CPP build arg).
+
+    Input is shaped the way Ollama shapes it for /api/generate: the Modelfile SYSTEM text and the
+    prompt go through the GGUF's chat template, with the Modelfile's top_p, stop strings and num_ctx.
+    The model is loaded on first use.
+    """
+    name = "llamacpp"
+
+    def __init__(self, model_path: str, modelfile_path: str, n_ctx: int = 0, n_threads: int = 0):
+        self.model_path = model_path
+        self.modelfile = read_modelfile(modelfile_path) if os.path.exists(modelfile_path) \
+            else {"system": "", "parameters": {}}
+        parameters = self.modelfile["parameters"]
+        self.system = self.modelfile["system"]
+        self.top_p = float(parameters.get("top_p", 0.9))
+        self.stop = list(parameters.get("stop", []))
+        self.n_ctx = n_ctx or int(parameters.get("num_ctx", 2048))
+        self.n_threads = n_threads or None  # None = llama.cpp picks the physical core count
+        self._llm = None
+        self._grammars: Dict[str, object] = {}
+        # A llama.cpp context runs one generation at a time
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._llm is None:
+            try:
+                from llama_cpp import Llama
+            except ImportError as e:
+                raise LLMBackendError("llamacpp: llama-cpp-python is not installed") from e
+            if not os.path.exists(self.model_path):
+                raise LLMBackendError(f"llamacpp: no model at {self.model_path}")
+            self._llm = Llama(
+                model_path=self.model_path, n_ctx=self.n_ctx, n_threads=self.n_threads, verbose=False
+            )
+        return self._llm
+
+    def _grammar(self, schema: Dict):
+        from llama_cpp import LlamaGrammar
+
+        key = json.dumps(schema, sort_keys=True)
+        if key not in self._grammars:
+            self._grammars[key] = LlamaGrammar.from_json_schema(key, verbose=False)
+        return self._grammars[key]
+
+    def _messages(self, prompt: str) -> List[Dict]:
+        messages = [{"role": "system", "content": self.system}] if self.system else []
+        return messages + [{"role": "user", "content": prompt}]
+
+    def _generate_sync(self, prompt, schema, temperature, max_tokens) -> Dict:
+        with self._lock:
+            llm = self._load()
+            started = time.perf_counter()
+            completion = llm.create_chat_completion(
+                messages=self._messages(prompt),
+                max_tokens=max_tokens or None,
+                temperature=temperature,
+                top_p=self.top_p,
+                stop=self.stop,
+                grammar=self._grammar(schema) if schema is not None else None,
+            )
+            elapsed = time.perf_counter() - started
+        try:
+            usage = completion.get("usage") or {}
+            text = completion["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            raise LLMBackendError(f"{self.name}: malformed response") from e
+        return {
+            "model": os.path.basename(self.model_path),
+            "response": text,
+            "done": True,
+            "prompt_eval_count": usage.get("prompt_tokens", 0),
+            "eval_count": usage.get("completion_tokens", 0),
+            "total_duration": int(elapsed * 1e9),
+        }
+
+    async def generate(self, prompt, schema=None, temperature=0.1, max_tokens=None):
+        try:
+            return await asyncio.to_thread(self._generate_sync, prompt, schema, temperature, max_tokens)
+        except LLMBackendError:
+            raise
+        except Exception as e:
+            raise LLMBackendError(f"llamacpp: {e!r}") from e
+
+
+class FakeBackend(LLMBackend):
+    """Same answers as the fake Ollama server, without HTTP."""
+    name = "fake"
+
+    async def generate(self, prompt, schema=None, temperature=0.1, max_tokens=None):
+        from app.fakes.ollama import count_tokens, fake_completion
+
+        text = fake_completion(prompt, json_mode=schema is not None)
+        return {
+            "model": "fake",
+            "response": text,
+            "done": True,
+            "prompt_eval_count": count_tokens(prompt),
+            "eval_count": count_tokens(text),
+        }
+
+
+class LLMRouter:
+    """Ordered failover across backends with a per-backend cool-down after repeated failures."""
+    def __init__(self, backends: List[LLMBackend], failure_threshold: int = 3, cooldown_seconds: float = 30.0):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = backends
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self._failures = {b.name: 0 for b in backends}
+        self._skip_until = {b.name: 0.0 for b in backends}
+
+    def available(self) -> List[LLMBackend]:
+        now = time.monotonic()
+        ready = [b for b in self.backends if now >= self._skip_until[b.name]]
+        # Every backend cooling down: try them all anyway rather than fail without trying
+        return ready or list(self.backends)
+
+    async def generate(self, prompt: str, schema: Optional[Dict] = None, temperature: float = 0.1,
+                       max_tokens: Optional[int] = None) -> Dict:
+        """Body from the first backend that answers, tagged with its name under "backend"."""
+        errors = []
+        for backend in self.available():
+            try:
+                body = await backend.generate(prompt, schema=schema, temperature=temperature, max_tokens=max_tokens)
+            except LLMBackendError as e:
+                errors.append(str(e))
+                self._failures[backend.name] += 1
+                if self._failures[backend.name] >= self.failure_threshold:
+                    self._skip_until[backend.name] = time.monotonic() + self.cooldown_seconds
+                LLM_BACKEND_REQUESTS.labels(backend.name, "error").inc()
+                print(f"LLM backend {backend.name} failed: {e}")
+                continue
+            self._failures[backend.name] = 0
+            self._skip_until[backend.name] = 0.0
+            LLM_BACKEND_REQUESTS.labels(backend.name, "ok").inc()
+            return {**body, "backend": backend.name}
+        raise LLMBackendError("; ".join(errors) or "no LLM backend available")
+
+
+def build_backend(name: str) -> LLMBackend:
+    if name == "ollama":
+        return OllamaBackend(settings.OLLAMA_URL, settings.MODEL_NAME, settings.OLLAMA_KEEP_ALIVE,
+                             settings.LLM_TIMEOUT_SECONDS)
+    if name == "openai":
+        return OpenAICompatibleBackend(settings.OPENAI_BASE_URL, settings.OPENAI_MODEL or settings.MODEL_NAME,
+                                       settings.OPENAI_API_KEY, settings.LLM_TIMEOUT_SECONDS)
+    if name == "llamacpp":
+        return LlamaCppBackend(settings.LLAMA_CPP_MODEL_PATH, settings.LLAMA_CPP_MODELFILE,
+                               settings.LLAMA_CPP_N_CTX, settings.LLAMA_CPP_THREADS)
+    if name == "fake":
+        return FakeBackend()
+    raise ValueError(f"Unknown LLM backend '{name}'. Expected one of ollama, openai, llamacpp, fake")
+
+
+def build_router(names: Optional[List[str]] = None) -> LLMRouter:
+    return LLMRouter(
+        [build_backend(name) for name in (names or settings.LLM_BACKENDS)],
+        failure_threshold=settings.LLM_FAILURE_THRESHOLD,
+        cooldown_seconds=settings.LLM_COOLDOWN_SECONDS,
+    )
@@ -0,0 +1,89 @@
+"""
+Prompt templates for the Scribe LLM.
+
+Every prompt is laid out static-first so Ollama/llama.cpp can reuse the KV cache of
+the longest common prefix between calls instead of prefilling the whole prompt:
+
+    SYSTEM PREFIX   identical for every call (role, vocabulary, encoding legend)
+    TASK BLOCK      identical for every call of one kind (forecast/validation share one)
+    VARIABLE DATA   ticker, token sequence, user question - always last
+
+Windows can also be aligned to fixed business-day boundaries (PROMPT_WINDOW_ALIGN):
+instead of the exact last N bars, the window starts at the latest aligned bar at least
+N bars back. Consecutive days for one ticker then share the whole sequence prefix and
+only the newly appended bars are prefilled, at the cost of windows of N..N+align-1 bars.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.ml.sequence_encoding import encode_sequence, legend
+
+# Business-day numbering origin for window alignment (any fixed Monday works)
+ALIGN_EPOCH = np.datetime64("2000-01-03", "D")
+
+FORECAST_TASK = (
+    "Task: Predict the single most likely NEXT composite token.\n"
+    "Output Requirement: JSON Only. Calculate specific confidence.\n"
+    "Example: { \"prediction\": \"P_MID_V_LOW\", \"confidence\": 72, \"reasoning\": \"Trend is flattening...\" }\n"
+)
+
+CHAT_TASK = (
+    "Task: Answer the user's question based ONLY on the token sequence. "
+    "You ONLY analyze price action patterns. Be concise.\n"
+)
+
+
+def system_prefix(encoding: str = "verbose") -> str:
+    legend_str = legend(encoding)
+    return (
+        "You are Finwise Scribe, a technical analysis engine for symbolic market data.\n"
+        "Token Vocabulary: P_[ACTION]_V_[VOLATILITY]\n"
+        + (f"{legend_str}\n" if legend_str else "")
+        + "\n"
+    )
+
+
+def aligned_window(tokens: pd.Series, size: int, align: int = 1) -> pd.Series:
+    """Last `size` bars, extended back to the nearest aligned business day when align > 1."""
+    if align <= 1 or len(tokens) <= size or not isinstance(tokens.index, pd.DatetimeIndex):
+        return tokens.tail(size)
+
+    first = tokens.index[-size].to_datetime64().astype("datetime64[D]")
+    ordinal = int(np.busday_count(ALIGN_EPOCH, first))
+    anchor = np.busday_offset(ALIGN_EPOCH, ordinal - ordinal % align, roll="forward")
+    return tokens[tokens.index >= pd.Timestamp(anchor)]
+
+
+class PromptBuilder:
+    def __init__(self, encoding: str = "verbose", align: int = 1):
+        self.encoding = encoding
+        self.align = align
+        self.prefix = system_prefix(encoding)
+
+    def _sequence(self, tokens, size: Optional[int]) -> str:
+        if size is not None and isinstance(tokens, pd.Series):
+            tokens = aligned_window(tokens, size, self.align)
+        values = tokens.values if isinstance(tokens, pd.Series) else tokens
+        return encode_sequence(values, self.encoding)
+
+    def forecast(self, tokens, symbol: str, size: Optional[int] = 60) -> str:
+        """Next-token forecast. Shadow validation uses the same prompt on a cut-off history."""
+        return (
+            f"{self.prefix}{FORECAST_TASK}\n"
+            f"Ticker: {symbol}\n"
+            f"Data: [{self._sequence(tokens, size)}]\n"
+        )
+
+    def chat(self, tokens, symbol: str, message: str, size: Optional[int] = 30) -> str:
+        sequence = (
+            f"Ticker: {symbol}\nData: [{self._sequence(tokens, size)}]"
+            if tokens is not None and len(tokens) else "Data: Market data unavailable."
+        )
+        return (
+            f"{self.prefix}{CHAT_TASK}\n"
+            f"{sequence}\n\n"
+            f"Question: {message}\n"
+            f"Answer:"
+        )
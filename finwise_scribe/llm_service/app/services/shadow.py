@@ -0,0 +1,62 @@
+import random
+import time
+from collections import OrderedDict, deque
+
+SHADOW_MODES = ("always", "sample", "once_per_bar", "off")
+
+class ShadowSampler:
+    """
+    Decides whether a forecast request also pays for a shadow validation run.
+    State is per-process; the engine runs on a single event loop, so no locking.
+    """
+    def __init__(self, mode: str = "once_per_bar", sample_rate: float = 0.1, max_tracked: int = 4096):
+        if mode not in SHADOW_MODES:
+            raise ValueError(f"Unknown shadow validation mode '{mode}'. Expected one of {SHADOW_MODES}")
+        self.mode = mode
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.max_tracked = max_tracked
+        self._seen = OrderedDict()
+
+    def should_validate(self, symbol: str, bar_date: str) -> bool:
+        if self.mode == "off":
+            return False
+        if self.mode == "always":
+            return True
+        if self.mode == "sample":
+            return random.random() < self.sample_rate
+
+        # once_per_bar: the first request for a (symbol, bar date) wins.
+        key = (symbol.upper(), bar_date)
+        if key in self._seen:
+            return False
+        self._seen[key] = True
+        if len(self._seen) > self.max_tracked:
+            self._seen.popitem(last=False)
+        return True
+
+
+class LLMBudget:
+    """Sliding one-minute window capping the LLM generations spent on shadow work."""
+    def __init__(self, per_minute: int, window_seconds: float = 60.0):
+        self.per_minute = per_minute
+        self.window_seconds = window_seconds
+        self._calls = deque()
+
+    def try_acquire(self) -> bool:
+        if self.per_minute <= 0:
+            return False
+
+        now = time.monotonic()
+        while self._calls and now - self._calls[0] >= self.window_seconds:
+            self._calls.popleft()
+
+        if len(self._calls) >= self.per_minute:
+            return False
+        self._calls.append(now)
+        return True
+
+    @property
+    def remaining(self) -> int:
+        now = time.monotonic()
+        used = sum(1 for t in self._calls if now - t < self.window_seconds)
+        return max(self.per_minute - used, 0)
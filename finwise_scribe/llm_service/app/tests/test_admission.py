@@ -0,0 +1,22 @@
+import asyncio
+
+from app.services.admission import InFlightLimiter
+
+
+async def _work(value):
+    return value
+
+
+def test_background_work_takes_its_own_slot():
+    limiter = InFlightLimiter(max_in_flight=1)
+
+    assert asyncio.run(limiter.run_if_free("shadow_validation", _work, 1)) == 1
+    assert limiter.in_flight == 0
+
+
+def test_background_work_is_skipped_at_the_cap():
+    limiter = InFlightLimiter(max_in_flight=1)
+    assert limiter.try_acquire("predict")
+
+    assert asyncio.run(limiter.run_if_free("shadow_validation", _work, 1)) is None
+    assert limiter.in_flight == 1
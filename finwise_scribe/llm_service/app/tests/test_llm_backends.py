@@ -0,0 +1,35 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.services.llm_backends import (
+    FakeBackend, LLMBackendError, LLMRouter, OllamaBackend, OpenAICompatibleBackend,
+)
+
+
+def _post_returning(response: httpx.Response):
+    response.request = httpx.Request("POST", "http://llm.test")
+    return patch("httpx.AsyncClient.post", new=AsyncMock(return_value=response))
+
+
+def test_router_fails_over_on_malformed_200():
+    router = LLMRouter([OllamaBackend("http://ollama.test", "finwise_scribe_v1"), FakeBackend()])
+
+    with _post_returning(httpx.Response(200, text="<html>upstream proxy page</html>")):
+        body = asyncio.run(router.generate("Data: [P_MID_V_LOW P_HIGH_V_HIGH]\n", schema={"type": "object"}))
+
+    assert body["backend"] == "fake"
+    assert "P_HIGH_V_HIGH" in body["response"]
+
+
+@pytest.mark.parametrize("backend, payload", [
+    (OllamaBackend("http://ollama.test", "m"), {"done": True}),
+    (OpenAICompatibleBackend("http://openai.test", "m"), {"choices": []}),
+    (OpenAICompatibleBackend("http://openai.test", "m"), ["not", "an", "object"]),
+])
+def test_unexpected_body_is_a_backend_error(backend, payload):
+    with _post_returning(httpx.Response(200, json=payload)):
+        with pytest.raises(LLMBackendError, match="malformed response"):
+            asyncio.run(backend.generate("prompt"))
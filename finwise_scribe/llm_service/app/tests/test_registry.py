@@ -0,0 +1,16 @@
+import os
+
+from app.ml.registry import MODEL_FILE, ModelRegistry
+
+
+def test_same_second_versions_order_numerically(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    names = ["v20240101-120000-10", "v20240101-120000", "v20240101-120000-2", "v20231231-235959-11"]
+    for name in names:
+        os.makedirs(os.path.join(registry.versions_dir, name))
+        open(os.path.join(registry.versions_dir, name, MODEL_FILE), "w").close()
+
+    assert registry.list_versions() == [
+        "v20231231-235959-11", "v20240101-120000", "v20240101-120000-2", "v20240101-120000-10",
+    ]
+    assert registry.resolve() == "v20240101-120000-10"
@@ -0,0 +1,50 @@
+"""
+Micro-benchmarks for the Scribe numeric hot paths, on synthetic OHLCV of increasing length.
+Each benchmark is parametrized by YEARS so results read as a scaling curve.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+YEARS = [1, 5, 20]
+TRADING_DAYS_PER_YEAR = 252
+
+
+def synthetic_ohlcv(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk daily bars, oldest first (the order FinwiseSymbolizer.fetch_data returns)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.005, n_bars))
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) * 1.004,
+            "Low": np.minimum(open_, close) * 0.996,
+            "Close": close,
+            "Volume": rng.lognormal(15, 0.4, n_bars).astype(np.int64),
+        },
+        index=pd.bdate_range("1990-01-01", periods=n_bars, name="Date"),
+    )
+
+
+@pytest.fixture(params=YEARS, ids=lambda y: f"{y}y")
+def ohlcv(request) -> pd.DataFrame:
+    return synthetic_ohlcv(request.param * TRADING_DAYS_PER_YEAR)
+
+
+class ZeroModel:
+    """Stands in for the Keras model so only the feature/window/token path is timed."""
+    def predict(self, x, verbose=0, **kwargs):
+        return np.zeros((len(x), 2), dtype=np.float32)
+
+
+@pytest.fixture(scope="session")
+def lstm_engine(tmp_path_factory):
+    from sklearn.preprocessing import MinMaxScaler
+    from app.ml.lstm_engine import LSTMEngine, ModelBundle
+    from app.ml.windowing import compute_features
+
+    engine = LSTMEngine(model_dir=str(tmp_path_factory.mktemp("models")), reload_interval=0)
+    scaler = MinMaxScaler().fit(compute_features(synthetic_ohlcv(5 * TRADING_DAYS_PER_YEAR)).values)
+    engine._bundles = {"current": ModelBundle("bench", ZeroModel(), scaler)}
+    return engine
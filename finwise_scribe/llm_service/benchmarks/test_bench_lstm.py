@@ -0,0 +1,47 @@
+import pytest
+
+from app.ml.train_lstm import LSTMTrainer
+from app.ml.windowing import compute_features, sliding_windows
+from conftest import TRADING_DAYS_PER_YEAR, synthetic_ohlcv
+
+
+def test_lstm_predict_preprocessing(benchmark, ohlcv, lstm_engine):
+    """LSTMEngine.predict minus the forward pass: features, last window, scaling, tokenizing."""
+    result = benchmark(lstm_engine.predict, "BENCH", data_override=ohlcv)
+    assert "prediction_token" in result
+
+
+def test_walk_forward_windows(benchmark, ohlcv, lstm_engine):
+    """All (n - 60) scaled windows, as built by the backtester and shadow validation."""
+    scaled = lstm_engine.scaler.transform(compute_features(ohlcv).values)
+    windows = benchmark(sliding_windows, scaled[:-1], lstm_engine.sequence_length)
+    assert windows.shape[1:] == (lstm_engine.sequence_length, 2)
+
+
+@pytest.mark.parametrize("n_tickers", [5, 25], ids=lambda n: f"{n}tickers")
+def test_trainer_fetch_and_prepare(benchmark, monkeypatch, tmp_path, n_tickers):
+    """Feature prep, scaler fit and window indexing for a 5y multi-ticker training set (network mocked)."""
+    tickers = [f"T{i}.US" for i in range(n_tickers)]
+    raw = {t: synthetic_ohlcv(5 * TRADING_DAYS_PER_YEAR, seed=i) for i, t in enumerate(tickers)}
+    monkeypatch.setattr("app.ml.train_lstm.fetch_many", lambda tickers, **kwargs: raw)
+
+    trainer = LSTMTrainer(tickers, processes=1, cache_dir=None, publish_role=None, model_dir=str(tmp_path))
+    data, ticker_starts = benchmark(trainer.fetch_and_prepare_data)
+    assert len(ticker_starts) == n_tickers
+
+
+@pytest.mark.parametrize("n_tickers", [5, 25], ids=lambda n: f"{n}tickers")
+def test_trainer_epoch_batches(benchmark, monkeypatch, tmp_path, n_tickers):
+    """One epoch of WindowedSequence batches (window gather + targets), without the model."""
+    tickers = [f"T{i}.US" for i in range(n_tickers)]
+    raw = {t: synthetic_ohlcv(5 * TRADING_DAYS_PER_YEAR, seed=i) for i, t in enumerate(tickers)}
+    monkeypatch.setattr("app.ml.train_lstm.fetch_many", lambda tickers, **kwargs: raw)
+
+    trainer = LSTMTrainer(tickers, processes=1, cache_dir=None, publish_role=None, model_dir=str(tmp_path))
+    train_seq, _ = trainer.build_sequences(*trainer.fetch_and_prepare_data(), batch_size=256)
+
+    def epoch():
+        for i in range(len(train_seq)):
+            train_seq[i]
+
+    benchmark(epoch)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from app.ml.symbolizer import FinwiseSymbolizer
+from app.ml.vocabulary import composite_token_ids, ids_to_tokens
+from app.ml.windowing import compute_features
+
+
+def test_symbolizer_process(benchmark, ohlcv):
+    symbolizer = FinwiseSymbolizer(tickers=["BENCH"])
+    _, _, tokens = benchmark(symbolizer.process, ohlcv)
+    assert len(tokens) > 0
+
+
+def test_token_from_values_scalar(benchmark, ohlcv, lstm_engine):
+    """The per-prediction thresholding in LSTMEngine, applied to every bar."""
+    features = compute_features(ohlcv).values
+
+    def tokenize():
+        return [lstm_engine._get_token_from_values(p, v) for p, v in features]
+
+    tokens = benchmark(tokenize)
+    assert len(tokens) == len(features)
+
+
+def test_token_from_values_vectorized(benchmark, ohlcv):
+    """Reference point: the same thresholds through the NumPy vocabulary helpers."""
+    features = compute_features(ohlcv).values
+
+    def tokenize():
+        return ids_to_tokens(composite_token_ids(features[:, 0], features[:, 1]))
+
+    tokens = benchmark(tokenize)
+    assert len(tokens) == len(features)